@@ -2,31 +2,115 @@ import sys
 import os
 import tempfile
 import datetime
+import sqlite3
+import posixpath
+import threading
+import hashlib
+import json
+import base64
+import shutil
+import subprocess
+import queue
+import itertools
+import time
+import bisect
+import random
+import re
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_EXCEPTION
 from pathlib import Path
+from abc import ABC, abstractmethod
 
-from PyQt5.QtGui import QPixmap, QKeyEvent, QMouseEvent
+START_TIME = time.monotonic()  # Before the Qt imports, so the startup report includes them
+
+from PyQt5.QtGui import QPixmap, QImage, QImageReader, QKeyEvent, QMouseEvent
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QGridLayout, QVBoxLayout, QScrollArea, QHBoxLayout, QPushButton, QLabel, QSizePolicy, QStackedLayout, QFileIconProvider, QToolButton, QListWidget, QListWidgetItem, QMessageBox, QSlider, QStyle
+    QApplication, QWidget, QGridLayout, QVBoxLayout, QScrollArea, QHBoxLayout, QPushButton, QLabel, QSizePolicy, QStackedLayout, QFileIconProvider, QToolButton, QListWidget, QListWidgetItem, QListView, QAbstractItemView, QMessageBox, QSlider, QStyle
 )
-from PyQt5.QtWebEngineWidgets import QWebEngineView
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
-from PyQt5.QtMultimediaWidgets import QVideoWidget
-from PyQt5.QtCore import QUrl, Qt, QTimer, QEvent, QPoint, QSize, QThread, pyqtSignal, pyqtSlot, QSizeF
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile  # Has to be imported before the QApplication is created
+from PyQt5.QtCore import QUrl, Qt, QTimer, QEvent, QPoint, QRect, QSize, QObject, QAbstractListModel, QModelIndex, pyqtSignal, pyqtSlot, QSizeF, QBuffer, QByteArray, QIODevice
 
 from PyQt5.QtGui import QIcon
 
-from enum import Enum, auto
-
-import dropbox
-from dropbox.files import FileMetadata, FolderMetadata
+from enum import Enum, IntEnum, auto
 
 import resources_rc  # ensures resources are loaded
+from contact_sheets import idle_priority, build_contact_sheet  # Run in ContactSheets' worker processes
+
+# Only needed once videos are played or the security video viewer is opened, so imported then
+# (or warmed up after the camera grid has painted) by load_video_modules / load_dropbox_modules
+QMediaPlayer = QMediaContent = QVideoWidget = QGraphicsVideoItem = None
+dropbox = FileMetadata = FolderMetadata = DeletedMetadata = ListFolderContinueError = None
+ThumbnailArg = ThumbnailFormat = ThumbnailSize = None
+np = None
+requests = None  # Snapshot and MJPEG camera tiles, see load_http_modules
 
 SOURCE_DIR = "/home/danny/Dropbox/Photos/Bigbertha_backup/"
 IMAGE_TIMER = 3000  # 3 seconds
 
 DROPBOX_ACCESS_TOKEN = os.environ.get("DROPBOX_ACCESS_TOKEN", "PASTE_YOUR_TOKEN_HERE")
 DROPBOX_ROOT_PATH = "/motion_images"  
+CLIP_INDEX_PATH = "./clip_index.sqlite"  # Local metadata index of everything under DROPBOX_ROOT_PATH
+CLIP_CACHE_DIR = "./clip_cache"  # Downloaded clips, named by Dropbox content_hash
+CLIP_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB, least recently played clips are evicted first
+PREFETCH_NEXT = 3  # Clips after the focused one (in grid order) to download in the background
+PREFETCH_PREVIOUS = 1  # Clips before the focused one to download in the background
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # Downloads check for cancellation after every chunk
+DROPBOX_MAX_WORKERS = 4  # Concurrent Dropbox requests, each with its own keep-alive connection
+CHUNKED_DOWNLOAD_MIN_BYTES = 4 * 1024 * 1024  # Clips at least this big are fetched as parallel byte ranges
+CHUNKED_DOWNLOAD_CONNECTIONS = 4  # Ranges fetched at once for a single chunked download
+CHUNKED_DOWNLOAD_RANGE_BYTES = 2 * 1024 * 1024  # Size of each byte range, also the unit of resume
+CHUNKED_RESUME_MAX_AGE = 24 * 60 * 60  # Partial downloads older than this are discarded at startup
+THUMBNAIL_CACHE_DIR = "./thumbnail_cache"  # Clip thumbnails, named by path and rev
+THUMBNAIL_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Least recently shown thumbnails are removed first
+THUMBNAIL_BATCH_SIZE = 25  # Most thumbnails Dropbox returns from one get_thumbnail_batch call
+THUMBNAIL_WORKERS = 1  # Threads running ffmpeg for thumbnails Dropbox can't make, apart from the Dropbox I/O ones
+CONTACT_SHEET_DIR = os.path.join(CLIP_CACHE_DIR, "sheets")  # Keyframe contact sheets, named by content_hash
+CONTACT_SHEET_GRID = (3, 3)  # Columns, rows of keyframes on a sheet
+CONTACT_SHEET_TILE = (160, 90)  # Size of each keyframe on the sheet, also used for scrub previews
+CONTACT_SHEET_WORKERS = 1  # ffmpeg processes run at idle priority; one keeps the Pi responsive
+CONTACT_SHEET_MAX_FILES = 5000  # Oldest sheets are removed at startup beyond this many
+CLIP_STORAGE = "dropbox"  # "dropbox" (API only), "local" (synced folder only) or "hybrid" (local copy when fresh)
+LOCAL_MIRROR_ROOT = "/home/danny/Dropbox/Apps/Home_Lan_Status"  # Dropbox desktop sync of the app folder
+STREAM_PLAYBACK = True  # Play uncached clips straight from a temporary link rather than waiting for the download
+STREAM_MIN_BYTES = 4 * 1024 * 1024  # Smaller clips download quicker than a stream can buffer
+# Clips from STREAM_MIN_BYTES up play from a link while they are cached in the background; keep
+# CHUNKED_DOWNLOAD_MIN_BYTES no bigger so that background copy (and prefetching) uses byte ranges
+CAMERA_PROFILE_DIR = "./webengine"  # HTTP cache and storage shared by every camera view
+CAMERA_HTTP_CACHE_MAX_BYTES = 64 * 1024 * 1024
+RENDERER_PROCESS_MODEL = "process-per-site"  # Chromium: "process-per-site-instance" (its default), "process-per-site" or "single-process"
+RENDERER_PROCESS_LIMIT = 3  # Most renderer processes Chromium starts, 0 for no limit
+RENDERER_MEMORY_BUDGET_BYTES = 600 * 1024 * 1024  # Resident memory of all camera renderers before pages are reloaded or discarded
+RENDERER_MEMORY_CHECK_MS = 60 * 1000
+RENDERER_RELIEF_INTERVAL = 5 * 60  # Seconds before the same view is reloaded again for memory
+GRID_DISCARD_AFTER_MS = 60 * 1000  # Grid tiles frozen while the grid is hidden are unloaded after this long
+GRID_RESUME_STAGGER_MS = 400  # Gap between unloaded tiles reconnecting when the grid comes back
+GRID_LAYOUT = (2, 4)  # Cameras per row, top first; "layout=" in urls.txt overrides it
+GRID_TILE_STAGGER_MS = 500  # Gap between grid tiles being created and starting to load, in priority order
+SNAPSHOT_INTERVAL_MS = 1000  # Refresh of snapshot and MJPEG tiles; "refresh=ms" in urls.txt per camera...
+SNAPSHOT_MIN_INTERVAL_MS = 200  # ...halved while the tile shows motion, but never below this...
+SNAPSHOT_MAX_INTERVAL_MS = 5000  # ...nor above this...
+SNAPSHOT_LOAD_FACTOR = 4  # ...and at least this many times what the last frame took to fetch and decode
+SNAPSHOT_WORKERS = 3  # Threads fetching and decoding snapshots for every tile (MJPEG streams have their own)
+SNAPSHOT_TIMEOUT = 10  # Seconds to connect or wait for data
+TILE_SAMPLE_MS = 2000  # Each visible grid tile is grabbed this often (spread over the interval) for health checks
+TILE_SAMPLE_SIZE = (32, 18)  # Grabs are shrunk to this many greyscale pixels
+HEALTH_FROZEN_AFTER = 30  # Seconds of byte-identical samples (even a still scene has sensor noise) before a feed counts as frozen
+HEALTH_BLACK_LEVEL = 12  # Mean grey level below which a sample is black...
+HEALTH_BLACK_AFTER = 30  # ...for this many seconds before the feed counts as lost
+HEALTH_BACKOFF_BASE = 2  # Seconds before the first reconnect, doubling with each failure...
+HEALTH_BACKOFF_MAX = 5 * 60  # ...up to this
+HEALTH_STATUS_FILE = "./camera_health.json"  # Rewritten whenever a camera's health changes
+MOTION_PIXEL_CHANGE = 24  # Grey levels a sample pixel has to change by to count as moving
+MOTION_THRESHOLD = 0.03  # Fraction of moving pixels that makes a tile active...
+MOTION_GLOBAL_CHANGE = 0.8  # ...unless more than this moved, which is lighting (IR switching, clouds)
+MOTION_HOLD_MS = 10 * 1000  # Tiles stay highlighted this long after their last motion
+MOTION_AUTO_FULLSCREEN = False  # Show the active camera fullscreen while the grid is idle, back to the grid after
+OVERNIGHT_HOURS = (1, 5)  # "Overnight" button: clips from 01:00 up to 05:00...
+OVERNIGHT_DAYS = 14  # ...over this many days
+REVIEW_RATES = (1, 2, 4, 8)  # Playback speeds offered when reviewing a whole day
+INCIDENT_GAP_SECONDS = 90  # Clips from any camera starting within this long of the last one ending share an incident
 
 class Mode(Enum):
     CAMERA = auto()
@@ -36,13 +120,62 @@ class Mode(Enum):
     PLAY = auto()
     SECURITY_CAMERA_FOLDER = auto()
     SECURITY_VIDEO = auto()
+    DAY_REVIEW = auto()
     
     
 from PyQt5.QtWidgets import QApplication, QGraphicsScene, QGraphicsView
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
-from PyQt5.QtMultimediaWidgets import QGraphicsVideoItem
 from PyQt5.QtCore import QUrl, QTimer, QSizeF
 
+
+def load_video_modules():
+    """Import QtMultimedia, needed by anything that plays video."""
+    global QMediaPlayer, QMediaContent, QVideoWidget, QGraphicsVideoItem
+    from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+    from PyQt5.QtMultimediaWidgets import QVideoWidget, QGraphicsVideoItem
+
+
+def load_dropbox_modules():
+    """Import the Dropbox SDK, and numpy if installed, for the security video viewer."""
+    global dropbox, FileMetadata, FolderMetadata, DeletedMetadata, ListFolderContinueError
+    global ThumbnailArg, ThumbnailFormat, ThumbnailSize, np
+    import dropbox
+    from dropbox.files import (
+        FileMetadata, FolderMetadata, DeletedMetadata, ListFolderContinueError, ThumbnailArg, ThumbnailFormat, ThumbnailSize
+    )
+    try:
+        import numpy as np
+    except ImportError:  # Only the cross-day event queries need it
+        np = None
+    ClipEventStore.available = np is not None
+
+
+def load_http_modules():
+    """Import requests for cameras shown by SnapshotTile rather than a web view."""
+    global requests
+    import requests
+
+
+class StartupReport:
+    """Seconds from START_TIME to each boot milestone, printed once the first camera has loaded."""
+
+    def __init__(self):
+        self.marks = []
+        self.reported = False
+
+    def mark(self, name):
+        if not self.reported:
+            self.marks.append((name, time.monotonic() - START_TIME))
+
+    def report(self):
+        if not self.reported:
+            self.reported = True
+            print("Startup: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.marks))
+
+
+STARTUP = StartupReport()
+STARTUP.mark("imports")
+
+
 class VideoView(QGraphicsView):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -51,9 +184,14 @@ class VideoView(QGraphicsView):
 
         self.video_item = QGraphicsVideoItem()
         self.scene.addItem(self.video_item)
+        # Second surface for a player preloading the next clip, shown by swapping visibility
+        self.standby_item = QGraphicsVideoItem()
+        self.standby_item.setVisible(False)
+        self.scene.addItem(self.standby_item)
 
         # Initial size
         self.video_item.setSize(QSizeF(self.viewport().size()))
+        self.standby_item.setSize(QSizeF(self.viewport().size()))
 
         # Styling
         self.setStyleSheet("background-color: black;")
@@ -64,16 +202,28 @@ class VideoView(QGraphicsView):
     def resizeEvent(self, event):
         # Resize video item to fill viewport
         self.video_item.setSize(QSizeF(self.viewport().size()))
+        self.standby_item.setSize(QSizeF(self.viewport().size()))
         super().resizeEvent(event)
+
+    def swapItems(self):
+        self.video_item, self.standby_item = self.standby_item, self.video_item
+        self.video_item.setVisible(True)
+        self.standby_item.setVisible(False)
         
 
 class VideoPlayerWidget(QWidget):
-    def __init__(self, player, parent=None):
+    def __init__(self, player, parent=None, standby_player=None):
         super().__init__(parent)
 
         self.view = VideoView()
         self.player = player
         self.player.setVideoOutput(self.view.video_item)
+        # Optional second player that the owner preloads with the next clip, see swapPlayers()
+        self.standby = standby_player
+        if self.standby is not None:
+            self.standby.setVideoOutput(self.view.standby_item)
+        self.rewind_at_end = True
+        self.rate = 1
         
         # --- Controls ---
         self.playButton = QPushButton("Play")
@@ -97,10 +247,29 @@ class VideoPlayerWidget(QWidget):
         self.positionSlider.setRange(0, 0)
         self.positionSlider.setFixedHeight(60)
         self.positionSlider.sliderMoved.connect(self.setPosition)
+
+        self.speedButton = QPushButton("1x")
+        self.speedButton.setFixedHeight(60)
+        self.speedButton.setFocusPolicy(Qt.StrongFocus)
+        self.speedButton.setStyleSheet(self.playButton.styleSheet())
+        self.speedButton.clicked.connect(lambda: self.stepRate(1, wrap=True))
+        self.speedButton.hide()
+
+        # Keyframes of the playing clip from its contact sheet, previewed above the slider when scrubbing
+        self.scrub_times = []
+        self.scrub_frames = []
+        self.scrubPreview = QLabel(self)
+        self.scrubPreview.setStyleSheet("border: 2px solid #00ffff; background-color: black;")
+        self.scrubPreview.hide()
+        self.positionSlider.setMouseTracking(True)
+        self.positionSlider.installEventFilter(self)
+        self.positionSlider.sliderMoved.connect(self.showScrubPreview)
+        self.positionSlider.sliderReleased.connect(self.scrubPreview.hide)
         
         # Layout for controls
         controlLayout = QHBoxLayout()
         controlLayout.addWidget(self.playButton)
+        controlLayout.addWidget(self.speedButton)
         controlLayout.addWidget(self.positionSlider)
 
         # Main layout
@@ -109,13 +278,42 @@ class VideoPlayerWidget(QWidget):
         layout.addLayout(controlLayout)
 
         # Connect signals
-        self.player.stateChanged.connect(self.updatePlayButton)
-        self.player.positionChanged.connect(self.updatePosition)
-        self.player.durationChanged.connect(self.updateDuration)
-        self.player.mediaStatusChanged.connect(self.handleMediaStatus)
+        self.connectPlayer(self.player, True)
+
+    def connectPlayer(self, player, connect):
+        for signal, slot in ((player.stateChanged, self.updatePlayButton),
+                             (player.positionChanged, self.updatePosition),
+                             (player.durationChanged, self.updateDuration),
+                             (player.mediaStatusChanged, self.handleMediaStatus)):
+            if connect:
+                signal.connect(slot)
+            else:
+                signal.disconnect(slot)
+
+    def swapPlayers(self):
+        """Show and control the standby player, which the owner has preloaded, in place of the current one."""
+        self.connectPlayer(self.player, False)
+        self.player, self.standby = self.standby, self.player
+        self.view.swapItems()
+        self.connectPlayer(self.player, True)
+        self.updateDuration(self.player.duration())
+        self.updatePlayButton(self.player.state())
+
+    def setRate(self, rate):
+        self.rate = rate
+        for player in (self.player, self.standby):
+            if player is not None:
+                player.setPlaybackRate(rate)
+        self.speedButton.setText(f"{rate}x")
+
+    def stepRate(self, step, wrap=False):
+        i = REVIEW_RATES.index(self.rate) + step if self.rate in REVIEW_RATES else 0
+        if wrap:
+            i %= len(REVIEW_RATES)
+        self.setRate(REVIEW_RATES[max(0, min(i, len(REVIEW_RATES) - 1))])
 
     def handleMediaStatus(self, status):
-        if status == QMediaPlayer.EndOfMedia:
+        if status == QMediaPlayer.EndOfMedia and self.rewind_at_end:
             # Reset pipeline immediately
             current_media = self.player.media()
             self.player.setMedia(current_media)
@@ -146,74 +344,1455 @@ class VideoPlayerWidget(QWidget):
 
     def setPosition(self, position):
         self.player.setPosition(position)
-        
-# ---------- Dropbox worker threads ----------
-class DropboxListWorker(QThread):
-    """Lists folders or files in a Dropbox path."""
-    listed = pyqtSignal(str, list, str)  # path, entries, error
 
-    def __init__(self, dbx, path, list_folders_only=False, parent=None):
-        super().__init__(parent)
-        self.dbx = dbx
+    def setScrubFrames(self, sheet_path=None, meta=None):
+        """Cut the contact sheet (see build_contact_sheet) into frames for scrub previews; no sheet clears them."""
+        self.scrub_times = []
+        self.scrub_frames = []
+        self.scrubPreview.hide()
+        sheet = QPixmap(sheet_path) if sheet_path else None
+        if sheet is None or sheet.isNull():
+            return
+        columns, rows = meta["grid"]
+        width, height = meta["tile"]
+        for i, time_ms in enumerate(meta["times_ms"]):
+            self.scrub_times.append(time_ms)
+            self.scrub_frames.append(sheet.copy(QRect((i % columns) * width, (i // columns) * height, width, height)))
+
+    def showScrubPreview(self, position):
+        if not self.scrub_frames:
+            return
+        i = max(0, bisect.bisect_right(self.scrub_times, position) - 1)
+        self.scrubPreview.setPixmap(self.scrub_frames[i])
+        self.scrubPreview.adjustSize()
+        # Centred over the point on the slider, kept inside the widget
+        slider = self.positionSlider
+        x = QStyle.sliderPositionFromValue(slider.minimum(), slider.maximum(), position, slider.width())
+        pos = slider.mapTo(self, QPoint(x - self.scrubPreview.width() // 2, -self.scrubPreview.height() - 8))
+        pos.setX(max(0, min(pos.x(), self.width() - self.scrubPreview.width())))
+        self.scrubPreview.move(pos)
+        self.scrubPreview.show()
+        self.scrubPreview.raise_()
+
+    def eventFilter(self, obj, event):
+        if obj is self.positionSlider:
+            if event.type() == QEvent.MouseMove and not self.positionSlider.isSliderDown():
+                slider = self.positionSlider
+                self.showScrubPreview(QStyle.sliderValueFromPosition(
+                    slider.minimum(), slider.maximum(), event.pos().x(), slider.width()))
+            elif event.type() == QEvent.Leave:
+                self.scrubPreview.hide()
+        return super().eventFilter(obj, event)
+
+# ---------- Local clip index ----------
+class ClipIndex:
+    """SQLite index of every folder and clip under the Dropbox root.
+
+    The Dropbox list cursor is stored alongside the entries so that after the
+    first full (recursive) listing only the deltas need to be fetched. The
+    index can instead be filled from a scan of a local mirror, in which case
+    the next Dropbox sync starts again from a full listing.
+    """
+
+    def __init__(self, db_path=CLIP_INDEX_PATH, root=DROPBOX_ROOT_PATH):
+        self.root = root.lower()
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    path_lower TEXT PRIMARY KEY,
+                    parent TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    size INTEGER,
+                    rev TEXT,
+                    content_hash TEXT,
+                    server_modified TEXT
+                )
+            """)
+            self.db.execute("CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT)")
+            # Learnt from the player, so kept apart from the listing rows that syncs replace
+            self.db.execute("CREATE TABLE IF NOT EXISTS durations (path_lower TEXT PRIMARY KEY, rev TEXT, duration_ms INTEGER)")
+
+    def get_state(self, key):
+        with self.lock:
+            row = self.db.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def get_cursor(self):
+        return self.get_state("cursor")
+
+    def is_populated(self):
+        return self.get_cursor() is not None or self.get_state("source") is not None
+
+    def list_children(self, path, list_folders_only=False):
+        """Return (kind, name, path_lower, size, rev, duration_ms) tuples for the direct children of path."""
+        query = ("SELECT e.kind, e.name, e.path_lower, e.size, e.rev, d.duration_ms FROM entries e "
+                 "LEFT JOIN durations d ON d.path_lower = e.path_lower AND d.rev = e.rev WHERE e.parent = ?")
+        if list_folders_only:
+            query += " AND e.kind = 'folder'"
+        with self.lock:
+            return [tuple(row) for row in self.db.execute(query, (path.lower(),))]
+
+    def entry(self, path):
+        """Return the stored metadata for a single path as a dict, or None."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT path_lower, kind, name, size, rev, content_hash, server_modified FROM entries WHERE path_lower = ?",
+                (path.lower(),)).fetchone()
+        if row is None:
+            return None
+        keys = ("path_lower", "kind", "name", "size", "rev", "content_hash", "server_modified")
+        return dict(zip(keys, row))
+
+    def list_clips(self):
+        """Return (path_lower, name, size, rev, duration_ms) for every file; duration_ms is None until played."""
+        with self.lock:
+            return self.db.execute(
+                "SELECT e.path_lower, e.name, e.size, e.rev, d.duration_ms FROM entries e "
+                "LEFT JOIN durations d ON d.path_lower = e.path_lower AND d.rev = e.rev "
+                "WHERE e.kind = 'file'").fetchall()
+
+    def set_duration(self, path, rev, duration_ms):
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO durations VALUES (?, ?, ?)", (path.lower(), rev, duration_ms))
+
+    def apply(self, entries, cursor, reset=False):
+        """Apply one page of list_folder results; returns the set of parent folders that changed."""
+        changed = set()
+        with self.lock, self.db:
+            if reset:
+                self.db.execute("DELETE FROM entries")
+                changed.add(self.root)
+            for e in entries:
+                path = e.path_lower
+                if path == self.root:
+                    continue
+                parent = posixpath.dirname(path)
+                if isinstance(e, FolderMetadata):
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO entries (path_lower, parent, kind, name) VALUES (?, ?, 'folder', ?)",
+                        (path, parent, e.name))
+                elif isinstance(e, FileMetadata):
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO entries VALUES (?, ?, 'file', ?, ?, ?, ?, ?)",
+                        (path, parent, e.name, e.size, e.rev, e.content_hash,
+                         e.server_modified.isoformat() if e.server_modified else None))
+                elif isinstance(e, DeletedMetadata):
+                    # A deleted folder takes all of its children with it
+                    prefix = path + "/"
+                    for (child_parent,) in self.db.execute(
+                            "SELECT DISTINCT parent FROM entries WHERE substr(path_lower, 1, ?) = ?",
+                            (len(prefix), prefix)):
+                        changed.add(child_parent)
+                    self.db.execute("DELETE FROM entries WHERE path_lower = ? OR substr(path_lower, 1, ?) = ?",
+                                    (path, len(prefix), prefix))
+                else:
+                    continue
+                changed.add(parent)
+            self.db.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('cursor', ?)", (cursor,))
+            self.db.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('source', 'dropbox')")
+        return changed
+
+    def apply_snapshot(self, rows):
+        """Make the index match a full listing of entry rows; returns the set of parent folders that changed.
+
+        Each row is (path_lower, parent, kind, name, size, rev, content_hash, server_modified).
+        """
+        changed = set()
+        with self.lock, self.db:
+            existing = {row[0]: row for row in self.db.execute(
+                "SELECT path_lower, parent, kind, name, size, rev, content_hash, server_modified FROM entries")}
+            for row in rows:
+                if existing.pop(row[0], None) != row:
+                    self.db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+                    changed.add(row[1])
+            for path, row in existing.items():
+                self.db.execute("DELETE FROM entries WHERE path_lower = ?", (path,))
+                changed.add(row[1])
+            # A Dropbox cursor no longer describes what is in the index
+            self.db.execute("DELETE FROM state WHERE key = 'cursor'")
+            self.db.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('source', 'local')")
+        return changed
+
+    def sync(self, dbx):
+        """Bring the index up to date with Dropbox; returns the set of folders whose contents changed."""
+        cursor = self.get_cursor() if self.get_state("source") != "local" else None
+        result = None
+        if cursor:
+            try:
+                result = dbx.files_list_folder_continue(cursor)
+            except dropbox.exceptions.ApiError as e:
+                # An expired cursor means starting again with a full listing
+                if not (isinstance(e.error, ListFolderContinueError) and e.error.is_reset()):
+                    raise
+        reset = result is None
+        if reset:
+            result = dbx.files_list_folder(self.root, recursive=True)
+        changed = self.apply(result.entries, result.cursor, reset=reset)
+        while result.has_more:
+            result = dbx.files_list_folder_continue(result.cursor)
+            changed |= self.apply(result.entries, result.cursor)
+        return changed
+
+
+# ---------- Clip records ----------
+VIDEO_EXTENSIONS = (".mp4", ".mpeg", ".mpg", ".m4v")
+DOC_EXTENSIONS = (".txt", ".md", ".pdf", ".doc", ".docx")
+NO_TIMESTAMP = -(1 << 62)  # Names that don't parse sort after everything else, newest first
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class ClipRecord:
+    """A listed clip (or folder) with its name parsed once, when the listing arrives.
+
+    Clips are named YYYYMMDD'T'HHMISS-cameraname.ext and day folders YYYY-MM-DD. ts holds
+    the wall-clock time in the name as epoch seconds, NO_TIMESTAMP if it doesn't parse, and
+    camera a small integer id (-1 if none), so sorting and labelling never touch strptime.
+    """
+    __slots__ = ("kind", "name", "path", "size", "rev", "ext", "camera", "ts", "duration_ms")
+    camera_ids = {}  # camera name -> id, shared by all records
+    camera_names = []
+    camera_lock = threading.Lock()  # Records are also built off the UI thread, for the event store
+
+    def __init__(self, kind, name, path, size=None, rev=None, duration_ms=None):
+        self.kind = kind
+        self.name = name
         self.path = path
-        self.list_folders_only = list_folders_only
+        self.size = size or 0
+        self.rev = rev
+        self.duration_ms = -1 if duration_ms is None else duration_ms  # -1 until the clip has been played
+        stem, ext = posixpath.splitext(name)
+        self.ext = ext.lower()
+        self.camera = -1
+        self.ts = NO_TIMESTAMP
+        if kind == "folder":
+            if len(name) == 10 and name[4] == name[7] == "-":
+                self.ts = ClipRecord.epoch(name[0:4], name[5:7], name[8:10])
+            return
+        datepart, sep, camera = stem.partition("-")
+        if len(datepart) == 15 and datepart[8] == "T":
+            self.ts = ClipRecord.epoch(datepart[0:4], datepart[4:6], datepart[6:8],
+                                       datepart[9:11], datepart[11:13], datepart[13:15])
+            if sep and self.ts != NO_TIMESTAMP:
+                self.camera = ClipRecord.camera_id(camera)
+
+    @staticmethod
+    def epoch(*fields):
+        try:
+            return int((datetime.datetime(*map(int, fields)) - EPOCH).total_seconds())
+        except ValueError:
+            return NO_TIMESTAMP
+
+    @staticmethod
+    def now():
+        """The current wall-clock time on the same scale as ts."""
+        return ClipRecord.epoch(*datetime.datetime.now().timetuple()[:6])
+
+    @classmethod
+    def camera_id(cls, camera):
+        camera_id = cls.camera_ids.get(camera)
+        if camera_id is None:
+            with cls.camera_lock:
+                camera_id = cls.camera_ids.get(camera)
+                if camera_id is None:
+                    cls.camera_names.append(camera)
+                    camera_id = cls.camera_ids[camera] = len(cls.camera_names) - 1
+        return camera_id
+
+    @property
+    def camera_name(self):
+        return ClipRecord.camera_names[self.camera] if self.camera >= 0 else None
+
+    @property
+    def is_video(self):
+        return self.kind == "file" and self.ext in VIDEO_EXTENSIONS
+
+    def time_label(self, with_date=False):
+        minutes, seconds = divmod(self.ts % 86400, 60)
+        hours, minutes = divmod(minutes, 60)
+        when = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        if with_date:
+            when = time.strftime("%d %b ", time.gmtime(self.ts)) + when
+        return when
+
+    def label(self, with_date=False):
+        """Tile text: "camera at HH:MM:SS" for clips, the name for everything else."""
+        if self.camera < 0 or not self.is_video:
+            return self.name
+        return f"{ClipRecord.camera_names[self.camera]} at {self.time_label(with_date)}"
+
+    @property
+    def end_ts(self):
+        return self.ts + max(self.duration_ms, 0) // 1000
+
+    @staticmethod
+    def newest_first(records):
+        return sorted(records, key=lambda r: r.ts, reverse=True)
+
+
+def group_incidents(records, gap=INCIDENT_GAP_SECONDS):
+    """Cluster clips from all cameras into incidents with one sweep in time order.
+
+    A clip joins the current incident if it starts no more than gap seconds after the
+    latest end seen so far (its start, for clips not yet played). Returns lists of
+    records, each in time order, oldest incident first; clips whose names don't parse
+    are left as incidents of their own at the end.
+    """
+    incidents = []
+    end = None
+    unparsed = []
+    for record in sorted(records, key=lambda r: r.ts):
+        if record.ts == NO_TIMESTAMP:
+            unparsed.append([record])
+            continue
+        if end is None or record.ts > end + gap:
+            incidents.append([])
+            end = record.ts
+        incidents[-1].append(record)
+        end = max(end, record.end_ts)
+    return incidents + unparsed
+
+
+class ClipEventStore:
+    """Columnar in-memory copy of every clip in the index, for questions that span days.
+
+    One NumPy array per column (ts, camera id, size, duration_ms), sorted by ts, alongside
+    the matching ClipRecords, so filters are vectorised masks over a searchsorted time range.
+    A store is built whole off the UI thread and then swapped in, never modified. Needs
+    numpy; without it available is False and the event views are not offered.
+    """
+    available = False  # Set by load_dropbox_modules
+
+    def __init__(self, records=()):
+        self.records = list(records)
+        if not self.available:
+            return
+        self.ts = np.fromiter((r.ts for r in self.records), np.int64, len(self.records))
+        self.camera = np.fromiter((r.camera for r in self.records), np.int32, len(self.records))
+        self.size = np.fromiter((r.size for r in self.records), np.int64, len(self.records))
+        self.duration_ms = np.fromiter((r.duration_ms for r in self.records), np.int64, len(self.records))
+
+    @classmethod
+    def load(cls, index, known=None):
+        """Build a store from the clip index; known (path_lower -> ClipRecord) saves re-parsing names."""
+        known = known or {}
+        records = []
+        for path, name, size, rev, duration_ms in index.list_clips():
+            record = known.get(path)
+            if record is None or record.rev != rev or record.name != name:
+                record = ClipRecord("file", name, path, size, rev)
+            if duration_ms is not None:
+                record.duration_ms = duration_ms
+            if record.ts != NO_TIMESTAMP and record.is_video:
+                records.append(record)
+        records.sort(key=lambda r: r.ts)
+        return cls(records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def query(self, start=None, end=None, cameras=None, time_of_day=None):
+        """Row numbers of the clips matching every filter given, newest first.
+
+        start/end are on the ClipRecord.ts scale (end exclusive), cameras a list of camera
+        names, time_of_day a (from, to) pair of seconds after midnight that wraps past
+        midnight when from > to.
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.ts, start, "left"))
+        hi = len(self.ts) if end is None else int(np.searchsorted(self.ts, end, "left"))
+        if hi <= lo:
+            return np.empty(0, np.int64)
+        mask = np.ones(hi - lo, bool)
+        if cameras is not None:
+            ids = [ClipRecord.camera_ids[c] for c in cameras if c in ClipRecord.camera_ids]
+            mask &= np.isin(self.camera[lo:hi], ids)
+        if time_of_day is not None:
+            begin, finish = time_of_day
+            tod = self.ts[lo:hi] % 86400
+            mask &= ((tod >= begin) & (tod < finish)) if begin <= finish else ((tod >= begin) | (tod < finish))
+        return (np.flatnonzero(mask) + lo)[::-1]
+
+    def records_for(self, rows):
+        return [self.records[row] for row in rows]
+
+    def by_camera_hour(self, rows=None, weights=None):
+        """(camera id x hour of day) array of clip counts, or of sums of a column given as weights."""
+        cameras = self.camera if rows is None else self.camera[rows]
+        hours = (self.ts if rows is None else self.ts[rows]) % 86400 // 3600
+        if weights is not None and rows is not None:
+            weights = weights[rows]
+        ncameras = len(ClipRecord.camera_names)
+        cells = np.bincount(cameras * 24 + hours, weights=weights, minlength=ncameras * 24)
+        return cells[:ncameras * 24].reshape(ncameras, 24)
+
+    def busiest_hours(self, rows=None):
+        """{camera name: (hour, clips)} for the hour of day each camera records most in."""
+        counts = self.by_camera_hour(rows)
+        return {ClipRecord.camera_names[c]: (int(counts[c].argmax()), int(counts[c].max()))
+                for c in range(counts.shape[0]) if counts[c].any()}
+
+
+# ---------- Local clip cache ----------
+def dropbox_content_hash(path, block_size=4 * 1024 * 1024):
+    """Compute the Dropbox content_hash of a local file (SHA-256 of the SHA-256s of each 4 MB block)."""
+    block_hashes = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            block_hashes.update(hashlib.sha256(block).digest())
+    return block_hashes.hexdigest()
+
+
+class ClipCache:
+    """Size-bounded LRU cache of downloaded clips, keyed by Dropbox content_hash.
+
+    Entries are validated against the content_hash when they are added, so a
+    hit can be played without going anywhere near the network.
+    """
+
+    def __init__(self, cache_dir=CLIP_CACHE_DIR, max_bytes=CLIP_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # content_hash -> (local_path, size), least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Rebuild LRU order from the files on disk; the mtime is bumped on every hit
+        found = []
+        for e in os.scandir(self.cache_dir):
+            if not e.is_file():
+                continue
+            if e.name.endswith(".part"):
+                # Left over from an interrupted download
+                os.remove(e.path)
+                continue
+            st = e.stat()
+            if e.name.endswith((".partial", ".partial.json")):
+                # Resumable chunked download, kept for a while in case the clip is opened again
+                if time.time() - st.st_mtime > CHUNKED_RESUME_MAX_AGE:
+                    os.remove(e.path)
+                continue
+            found.append((st.st_mtime, Path(e.name).stem, e.path, st.st_size))
+        for _, content_hash, path, size in sorted(found):
+            self.entries[content_hash] = (path, size)
+            self.total_bytes += size
+        self.evict()
+
+    def temp_path(self, name):
+        """Return a fresh path in the cache dir to download into before calling put()."""
+        fd, path = tempfile.mkstemp(suffix=Path(name).suffix + ".part", dir=self.cache_dir)
+        os.close(fd)
+        return path
+
+    def resume_paths(self, content_hash):
+        """Data and state file paths for a resumable chunked download of content_hash."""
+        data_path = os.path.join(self.cache_dir, content_hash + ".partial")
+        return data_path, data_path + ".json"
+
+    def get(self, content_hash):
+        """Return the local path of a cached clip, or None on a miss."""
+        with self.lock:
+            entry = self.entries.get(content_hash) if content_hash else None
+            if entry is not None and os.path.exists(entry[0]):
+                self.entries.move_to_end(content_hash)
+                self.hits += 1
+                local_path = entry[0]
+            else:
+                if entry is not None:
+                    # File was removed behind our back
+                    del self.entries[content_hash]
+                    self.total_bytes -= entry[1]
+                self.misses += 1
+                return None
+        os.utime(local_path)
+        return local_path
+
+    def peek(self, content_hash):
+        """Like get() but without touching the LRU order or the hit/miss statistics."""
+        with self.lock:
+            entry = self.entries.get(content_hash) if content_hash else None
+        if entry is not None and os.path.exists(entry[0]):
+            return entry[0]
+        return None
+
+    def contains(self, content_hash):
+        return self.peek(content_hash) is not None
+
+    def put(self, content_hash, downloaded_path, name):
+        """Move a downloaded file into the cache and return its cached path."""
+        actual_hash = dropbox_content_hash(downloaded_path)
+        if actual_hash != content_hash:
+            os.remove(downloaded_path)
+            raise RuntimeError(f"Content hash mismatch for {name}")
+        local_path = os.path.join(self.cache_dir, content_hash + Path(name).suffix.lower())
+        os.replace(downloaded_path, local_path)
+        size = os.path.getsize(local_path)
+        with self.lock:
+            old = self.entries.pop(content_hash, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self.entries[content_hash] = (local_path, size)
+            self.total_bytes += size
+        self.evict()
+        return local_path
+
+    def evict(self):
+        # Always keep the most recent entry, even if it is bigger than the budget on its own
+        with self.lock:
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, (path, size) = self.entries.popitem(last=False)
+                self.total_bytes -= size
+                self.evictions += 1
+                self.evicted_bytes += size
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "evicted_bytes": self.evicted_bytes,
+            }
+
+
+# ---------- Thumbnails ----------
+class ThumbnailCache:
+    """Size-bounded LRU directory of clip thumbnails, one per Dropbox path, named by path and rev.
+
+    Which rev each path has is kept in memory (rebuilt from the file names at startup),
+    so replacing a thumbnail or checking for one never has to scan the directory.
+    """
+
+    def __init__(self, cache_dir=THUMBNAIL_CACHE_DIR, max_bytes=THUMBNAIL_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # path key -> (rev, size), least recently used first
+        self.total_bytes = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Rebuild LRU order from the files on disk; the mtime is bumped on every hit
+        found = []
+        for e in os.scandir(self.cache_dir):
+            if not e.is_file():
+                continue
+            if e.name.endswith((".tmp", ".frame.jpg")) or "_" not in e.name:
+                # Left over from an interrupted write or ffmpeg grab
+                os.remove(e.path)
+                continue
+            st = e.stat()
+            key, rev = Path(e.name).stem.split("_", 1)
+            found.append((st.st_mtime, key, rev, st.st_size, e.path))
+        for _, key, rev, size, path in sorted(found):
+            old = self.entries.pop(key, None)
+            if old is not None:
+                # An older rev of the same clip
+                self.total_bytes -= old[1]
+                os.remove(os.path.join(self.cache_dir, f"{key}_{old[0]}.jpg"))
+            self.entries[key] = (rev, size)
+            self.total_bytes += size
+        self.evict()
+
+    def key_for(self, path):
+        return hashlib.sha1(path.lower().encode("utf-8")).hexdigest()
+
+    def path_for(self, path, rev):
+        return os.path.join(self.cache_dir, f"{self.key_for(path)}_{rev}.jpg")
+
+    def get(self, path, rev):
+        key = self.key_for(path)
+        thumb_path = self.path_for(path, rev)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != rev:
+                return None
+            if not os.path.exists(thumb_path):
+                # File was removed behind our back
+                del self.entries[key]
+                self.total_bytes -= entry[1]
+                return None
+            self.entries.move_to_end(key)
+        os.utime(thumb_path)
+        return thumb_path
+
+    def put(self, path, rev, data):
+        key = self.key_for(path)
+        thumb_path = self.path_for(path, rev)
+        with open(thumb_path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(thumb_path + ".tmp", thumb_path)
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self.entries[key] = (rev, len(data))
+            self.total_bytes += len(data)
+        if old is not None and old[0] != rev:
+            # Thumbnail of an older revision of the same clip
+            try:
+                os.remove(os.path.join(self.cache_dir, f"{key}_{old[0]}.jpg"))
+            except OSError:
+                pass
+        self.evict()
+        return thumb_path
+
+    def evict(self):
+        with self.lock:
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                key, (rev, size) = self.entries.popitem(last=False)
+                self.total_bytes -= size
+                try:
+                    os.remove(os.path.join(self.cache_dir, f"{key}_{rev}.jpg"))
+                except OSError:
+                    pass
 
-    def run(self):
+
+def fetch_thumbnail_batch(dbx, thumbnails, entries):
+    """Fetch thumbnails for up to THUMBNAIL_BATCH_SIZE (path, rev) pairs in one call.
+
+    Returns {path: local thumbnail path} for the ones Dropbox could render.
+    """
+    args = [ThumbnailArg(path, format=ThumbnailFormat.jpeg, size=ThumbnailSize.w256h256) for path, _ in entries]
+    result = dbx.files_get_thumbnail_batch(args)
+    fetched = {}
+    for (path, rev), e in zip(entries, result.entries):
+        if e.is_success():
+            fetched[path] = thumbnails.put(path, rev, base64.b64decode(e.get_success().thumbnail))
+    return fetched
+
+
+def generate_thumbnail(thumbnails, path, rev, clip_path):
+    """Grab a frame from a locally cached clip with ffmpeg; returns the thumbnail path or None."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return None
+    frame_path = thumbnails.path_for(path, rev) + ".frame.jpg"
+    try:
+        subprocess.run([ffmpeg, "-nostdin", "-loglevel", "error", "-ss", "1", "-i", clip_path,
+                        "-frames:v", "1", "-vf", "scale=256:-2", "-y", frame_path], check=True, timeout=30)
+        if not os.path.exists(frame_path):
+            return None
+        with open(frame_path, "rb") as f:
+            data = f.read()
+        return thumbnails.put(path, rev, data)
+    finally:
+        if os.path.exists(frame_path):
+            os.remove(frame_path)
+
+
+class ContactSheets(QObject):
+    """Keyframe contact sheets of cached clips, made by ffmpeg in a process pool at idle priority.
+
+    Sheets are keyed by content_hash like the clip cache they sit in, so they outlive
+    eviction of the clip itself. ready is emitted on the UI thread with the key the sheet
+    was requested for (the Dropbox path).
+    """
+    ready = pyqtSignal(str, str)  # key, sheet path
+    built = pyqtSignal(str, str, str, str)  # key, content_hash, sheet path, error - from the pool's thread
+
+    def __init__(self, sheet_dir=CONTACT_SHEET_DIR, workers=CONTACT_SHEET_WORKERS, parent=None):
+        super().__init__(parent)
+        self.sheet_dir = sheet_dir
+        os.makedirs(self.sheet_dir, exist_ok=True)
+        self.pending = set()  # content_hashes being built
+        self.failed = set()  # Not retried this session
+        self.meta = {}  # content_hash -> parsed .json
+        self.built.connect(self.onBuilt)
+        self.prune()
+        # Not fork: this process has Qt, Chromium and thread pools running, whose locks a forked
+        # child could inherit held. Workers come from a forkserver that only preloads contact_sheets,
+        # and are started with the main script hidden (see submit) so they never import Qt.
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["contact_sheets"])
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=idle_priority)
+
+    def prune(self):
+        sheets = [e for e in os.scandir(self.sheet_dir) if e.name.endswith(".jpg")]
+        for e in sheets:
+            if ".tmp" in e.name:
+                os.remove(e.path)
+        sheets = sorted((e for e in sheets if ".tmp" not in e.name), key=lambda e: e.stat().st_mtime)
+        for e in sheets[:max(0, len(sheets) - CONTACT_SHEET_MAX_FILES)]:
+            for path in (e.path, e.path + ".json"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def path_for(self, content_hash):
+        return os.path.join(self.sheet_dir, f"{content_hash}.jpg")
+
+    def get(self, content_hash):
+        if not content_hash:
+            return None
+        sheet_path = self.path_for(content_hash)
+        return sheet_path if os.path.exists(sheet_path + ".json") and os.path.exists(sheet_path) else None
+
+    def frames(self, content_hash):
+        """(sheet path, meta) with meta as written by build_contact_sheet, or None."""
+        sheet_path = self.get(content_hash)
+        if sheet_path is None:
+            return None
+        if content_hash not in self.meta:
+            try:
+                with open(sheet_path + ".json") as f:
+                    self.meta[content_hash] = json.load(f)
+            except (OSError, ValueError):
+                return None
+        return sheet_path, self.meta[content_hash]
+
+    def request(self, key, content_hash, clip_path):
+        if not content_hash or content_hash in self.pending or content_hash in self.failed:
+            return
+        sheet_path = self.get(content_hash)
+        if sheet_path:
+            self.ready.emit(key, sheet_path)
+            return
+        self.pending.add(content_hash)
+        future = self.submit(build_contact_sheet, clip_path, self.path_for(content_hash),
+                             CONTACT_SHEET_GRID, CONTACT_SHEET_TILE)
+        future.add_done_callback(lambda f: self.finished(key, content_hash, f))
+
+    def submit(self, fn, *args):
+        # The pool starts its workers inside submit. multiprocessing has a new worker import the
+        # parent's main script (this one, with Qt) as __mp_main__ unless __main__ has no __file__,
+        # so hide it meanwhile; everything the workers run is in contact_sheets
+        main = sys.modules["__main__"]
+        main_path = main.__dict__.pop("__file__", None)
         try:
-            result = self.dbx.files_list_folder(self.path)
-            entries = []
-            for e in result.entries:
-                if isinstance(e, FolderMetadata):
-                    entries.append(("folder", e.name, e.path_lower))
-                elif isinstance(e, FileMetadata):
-                    if self.list_folders_only:
-                        continue
-                    entries.append(("file", e.name, e.path_lower))
-            # Handle pagination (if many items)
-            while result.has_more:
-                result = self.dbx.files_list_folder_continue(result.cursor)
-                for e in result.entries:
-                    if isinstance(e, FolderMetadata):
-                        entries.append(("folder", e.name, e.path_lower))
-                    elif not self.list_folders_only and isinstance(e, FileMetadata):
-                        entries.append(("file", e.name, e.path_lower))
-
-            self.listed.emit(self.path, entries, "")
-        except Exception as e:
-            self.listed.emit(self.path, [], str(e))
+            return self.pool.submit(fn, *args)
+        finally:
+            if main_path is not None:
+                main.__file__ = main_path
+
+    def finished(self, key, content_hash, future):
+        # Called on the pool's management thread, so hand over to the UI thread through a signal
+        if future.cancelled():
+            return
+        error = future.exception()
+        self.built.emit(key, content_hash, "" if error else future.result(), str(error or ""))
+
+    @pyqtSlot(str, str, str, str)
+    def onBuilt(self, key, content_hash, sheet_path, error):
+        self.pending.discard(content_hash)
+        if error:
+            print(f"Contact sheet for {key} failed: {error}")
+            self.failed.add(content_hash)
+            return
+        self.ready.emit(key, sheet_path)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------- Dropbox I/O executor ----------
+class JobPriority(IntEnum):
+    USER = 0       # Something the user clicked on and is waiting for
+    THUMBNAIL = 1  # Thumbnails for tiles that are on screen
+    PREFETCH = 2   # Clips the user is likely to want next
+    SYNC = 3       # Background index updates
+
+
+class DropboxJob:
+    """A unit of work queued on the DropboxExecutor, shared by every request for the same key."""
+
+    def __init__(self, name, fn, priority, key):
+        self.name = name
+        self.fn = fn
+        self.priority = priority
+        self.key = key
+        self.requests = []
+        self.cancelled = False
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+    def is_cancelled(self):
+        return self.cancelled
+
+    def is_done(self):
+        return self.cancelled or self.finished_at is not None
+
+    def wait_ms(self):
+        return ((self.started_at or self.submitted_at) - self.submitted_at) * 1000
 
+    def run_ms(self):
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return (self.finished_at - self.started_at) * 1000
 
-class DropboxDownloadWorker(QThread):
-    """Downloads a Dropbox file to a local temp path."""
-    downloaded = pyqtSignal(str, str, str)  # dropbox_path, local_path, error
 
-    def __init__(self, dbx, dropbox_path, target_dir=None, parent=None):
+class DropboxRequest:
+    """One caller's interest in a (possibly shared) DropboxJob."""
+
+    def __init__(self, executor, job, callback):
+        self.executor = executor
+        self.job = job
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        # The job itself is only cancelled once nobody else is waiting on it
+        if not self.cancelled:
+            self.cancelled = True
+            self.executor.detach(self)
+
+    def is_done(self):
+        return self.cancelled or self.job.is_done()
+
+
+class DropboxExecutor(QObject):
+    """Bounded pool of threads running all Dropbox I/O over one keep-alive HTTP session.
+
+    Jobs run in priority order and their callbacks are called back on the UI
+    thread with (result, error). Submitting a job with the same key as one
+    that is still in flight attaches to it rather than starting another.
+    """
+    jobFinished = pyqtSignal(object, object, str)  # job, result, error
+
+    def __init__(self, token, max_workers=DROPBOX_MAX_WORKERS, parent=None):
         super().__init__(parent)
-        self.dbx = dbx
-        self.dropbox_path = dropbox_path
-        self.target_dir = target_dir or tempfile.gettempdir()
+        # One pooled connection per worker, so TLS handshakes are paid once rather than per job
+        self.session = dropbox.create_session(max_connections=max_workers + CHUNKED_DOWNLOAD_CONNECTIONS)
+        # No token means there is no Dropbox account to talk to (local mirror only)
+        self.dbx = dropbox.Dropbox(token, session=self.session) if token else None
+        self.jobs = queue.PriorityQueue()
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+        self.inflight = {}  # key -> DropboxJob, only touched on the UI thread
+        # Emitted from the worker threads, so delivery is queued onto the UI thread
+        self.jobFinished.connect(self.deliver)
+        for i in range(max_workers):
+            threading.Thread(target=self.work, name=f"dropbox-{i}", daemon=True).start()
+
+    def submit(self, name, fn, priority, callback=None, key=None):
+        """Queue fn(dbx, job) to run on the pool, or join the in-flight job with the same key.
+
+        Returns a DropboxRequest that can be cancelled without affecting anyone
+        else waiting on the same job.
+        """
+        job = self.inflight.get(key) if key is not None else None
+        if job is None or job.cancelled:
+            job = DropboxJob(name, fn, priority, key)
+            if key is not None:
+                self.inflight[key] = job
+            self.jobs.put((priority, next(self.sequence), job))
+        else:
+            print(f"Dropbox job {job.name}: joined by another {priority.name} request")
+            if priority < job.priority and job.started_at is None:
+                # Queue it again at the higher priority; whichever copy comes out first runs it
+                job.priority = priority
+                self.jobs.put((priority, next(self.sequence), job))
+        request = DropboxRequest(self, job, callback)
+        job.requests.append(request)
+        return request
+
+    def detach(self, request):
+        job = request.job
+        if request in job.requests:
+            job.requests.remove(request)
+        if not job.requests and not job.is_done():
+            job.cancelled = True
+            if self.inflight.get(job.key) is job:
+                del self.inflight[job.key]
+
+    def work(self):
+        while True:
+            _, _, job = self.jobs.get()
+            with self.lock:
+                if job.cancelled or job.started_at is not None:
+                    continue
+                job.started_at = time.monotonic()
+            try:
+                result, error = job.fn(self.dbx, job), ""
+            except Exception as e:
+                result, error = None, str(e)
+            job.finished_at = time.monotonic()
+            self.jobFinished.emit(job, result, error)
+
+    @pyqtSlot(object, object, str)
+    def deliver(self, job, result, error):
+        if self.inflight.get(job.key) is job:
+            del self.inflight[job.key]
+        print(f"Dropbox job {job.name} ({job.priority.name}): waited {job.wait_ms():.0f} ms, "
+              f"ran {job.run_ms():.0f} ms{' (cancelled)' if job.cancelled else ''}")
+        if job.cancelled:
+            return
+        for request in list(job.requests):
+            if not request.cancelled and request.callback is not None:
+                request.callback(result, error)
+
 
-    def run(self):
+class DownloadCancelled(Exception):
+    pass
+
+
+def download_to_cache(dbx, dropbox_path, cache, cancelled=None):
+    """Stream a Dropbox file into the clip cache and return its local path.
+
+    cancelled is polled between chunks; if it returns True the partial
+    download is thrown away and DownloadCancelled is raised.
+    """
+    part_path = cache.temp_path(dropbox_path)
+    try:
+        metadata, response = dbx.files_download(dropbox_path)
+        try:
+            with open(part_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if cancelled is not None and cancelled():
+                        raise DownloadCancelled(dropbox_path)
+                    f.write(chunk)
+        finally:
+            response.close()
+        return cache.put(metadata.content_hash, part_path, metadata.name)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+def chunked_download_to_cache(dbx, session, dropbox_path, cache, cancelled=None,
+                              connections=CHUNKED_DOWNLOAD_CONNECTIONS, range_bytes=CHUNKED_DOWNLOAD_RANGE_BYTES):
+    """Fetch a Dropbox file as parallel byte ranges into the clip cache and return its local path.
+
+    The ranges are written into a preallocated file next to the cache, and the
+    finished ones are recorded in a small JSON file so that an interrupted
+    download (cancelled, crashed or restarted) carries on where it left off.
+    """
+    link = dbx.files_get_temporary_link(dropbox_path)
+    metadata = link.metadata
+    size = metadata.size
+    data_path, state_path = cache.resume_paths(metadata.content_hash)
+    ranges = [(start, min(start + range_bytes, size) - 1) for start in range(0, size, range_bytes)]
+
+    done = set()
+    if os.path.exists(data_path) and os.path.exists(state_path):
+        try:
+            with open(state_path, "r") as f:
+                done = set(json.load(f)["done"])
+        except Exception:
+            done = set()
+    resumed_bytes = sum(ranges[i][1] - ranges[i][0] + 1 for i in done if i < len(ranges))
+
+    fd = os.open(data_path, os.O_RDWR | os.O_CREAT)
+    state_lock = threading.Lock()
+    failed = threading.Event()  # One range failing stops the rest rather than letting them finish
+    fetched_bytes = 0
+    started = time.monotonic()
+
+    def fetch(i):
+        nonlocal fetched_bytes
+        start, end = ranges[i]
+        offset = start
+        if failed.is_set():
+            raise DownloadCancelled(dropbox_path)
+        response = session.get(link.link, headers={"Range": f"bytes={start}-{end}"}, stream=True, timeout=60)
+        try:
+            if response.status_code != 206 and not (start == 0 and end == size - 1):
+                raise RuntimeError(f"Range request for {dropbox_path} returned HTTP {response.status_code}")
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                if failed.is_set() or (cancelled is not None and cancelled()):
+                    raise DownloadCancelled(dropbox_path)
+                os.pwrite(fd, chunk, offset)
+                offset += len(chunk)
+        finally:
+            response.close()
+        if offset != end + 1:
+            raise RuntimeError(f"Short read for {dropbox_path} bytes {start}-{end}")
+        with state_lock:
+            done.add(i)
+            fetched_bytes += end - start + 1
+            with open(state_path, "w") as f:
+                json.dump({"path": dropbox_path, "size": size, "done": sorted(done)}, f)
+
+    try:
+        if os.fstat(fd).st_size != size:
+            # Reserve the whole file up front so the ranges can be written in any order
+            if hasattr(os, "posix_fallocate") and size:
+                os.posix_fallocate(fd, 0, size)
+            os.ftruncate(fd, size)
+        todo = [i for i in range(len(ranges)) if i not in done]
+        with ThreadPoolExecutor(max_workers=connections) as pool:
+            futures = [pool.submit(fetch, i) for i in todo]
+            finished, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            errors = [f.exception() for f in finished if f.exception() is not None]
+            if errors:
+                failed.set()
+                for future in futures:
+                    future.cancel()
+                # Report the range that failed rather than one stopped because of it
+                raise next((e for e in errors if not isinstance(e, DownloadCancelled)), errors[0])
+    finally:
+        os.close(fd)
+
+    elapsed = time.monotonic() - started
+    print(f"Chunked download of {dropbox_path}: {fetched_bytes / 1e6:.1f} MB in {elapsed:.1f} s "
+          f"({fetched_bytes / 1e6 / max(elapsed, 1e-6):.2f} MB/s over {connections} connections, "
+          f"{resumed_bytes / 1e6:.1f} MB resumed)")
+    os.remove(state_path)
+    return cache.put(metadata.content_hash, data_path, metadata.name)
+
+
+def download_clip(dbx, session, dropbox_path, cache, cancelled=None, size=None, chunked=None):
+    """Download a clip into the cache, as parallel ranges if chunked (by default when size is large)."""
+    if chunked is None:
+        chunked = size is not None and size >= CHUNKED_DOWNLOAD_MIN_BYTES
+    if chunked:
+        return chunked_download_to_cache(dbx, session, dropbox_path, cache, cancelled)
+    return download_to_cache(dbx, dropbox_path, cache, cancelled)
+
+
+# ---------- Clip storage backends ----------
+class ClipStorage(ABC):
+    """Where the clip index is filled from and where clips are played from.
+
+    sync() and fetch() may block on the network or disk so are run as jobs on
+    the DropboxExecutor; local_copy() never touches the network.
+    """
+    remote = True  # Whether Dropbox API features (streaming links, server thumbnails) are available
+
+    @abstractmethod
+    def sync(self, dbx, index):
+        """Bring the index up to date; returns the set of folders whose contents changed."""
+
+    @abstractmethod
+    def local_copy(self, entry, cache, verify=False):
+        """Path of a playable local copy of the clip if there is one, else None."""
+
+    @abstractmethod
+    def fetch(self, dbx, session, entry, cache, cancelled=None, chunked=None):
+        """Return a playable local path for the clip, downloading it if needed."""
+
+
+class DropboxApiStorage(ClipStorage):
+    """Everything over the Dropbox HTTP API, with clips downloaded into the clip cache."""
+
+    def sync(self, dbx, index):
+        return index.sync(dbx)
+
+    def local_copy(self, entry, cache, verify=False):
+        return cache.peek(entry["content_hash"])
+
+    def fetch(self, dbx, session, entry, cache, cancelled=None, chunked=None):
+        return download_clip(dbx, session, entry["path_lower"], cache, cancelled,
+                             size=entry["size"], chunked=chunked)
+
+
+class LocalMirrorStorage(ClipStorage):
+    """Reads clips straight out of the folder kept in sync by the Dropbox desktop client."""
+    remote = False
+
+    def __init__(self, mirror_root=LOCAL_MIRROR_ROOT):
+        self.mirror_root = mirror_root
+        self.lock = threading.Lock()
+        self.dir_names = {}  # local dir -> (mtime_ns, {lower name: name})
+        self.hashes = {}  # local path -> (mtime_ns, size, content_hash)
+
+    def resolve(self, path_lower):
+        """Map a Dropbox path_lower onto the real, case-preserving path in the mirror, or None."""
+        local = self.mirror_root
+        for part in path_lower.strip("/").split("/"):
+            candidate = os.path.join(local, part)
+            if not os.path.exists(candidate):
+                names = self.names_in(local)
+                if part not in names:
+                    return None
+                candidate = os.path.join(local, names[part])
+            local = candidate
+        return local
+
+    def names_in(self, local_dir):
         try:
-            # Derive a safe local filename
-            name = Path(self.dropbox_path).name
-            local_path = os.path.join(self.target_dir, name)
-            # Ensure uniqueness
-            base = local_path
-            i = 1
-            while os.path.exists(local_path):
-                stem = Path(base).stem
-                suffix = Path(base).suffix
-                local_path = os.path.join(self.target_dir, f"{stem}_{i}{suffix}")
+            mtime = os.stat(local_dir).st_mtime_ns
+        except OSError:
+            return {}
+        with self.lock:
+            cached = self.dir_names.get(local_dir)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, {name.lower(): name for name in os.listdir(local_dir)})
+            with self.lock:
+                self.dir_names[local_dir] = cached
+        return cached[1]
+
+    def content_hash(self, local_path):
+        # Hashing a clip is far cheaper than downloading it, and only needs doing once per version
+        st = os.stat(local_path)
+        with self.lock:
+            cached = self.hashes.get(local_path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+        content_hash = dropbox_content_hash(local_path)
+        with self.lock:
+            self.hashes[local_path] = (st.st_mtime_ns, st.st_size, content_hash)
+        return content_hash
+
+    def sync(self, dbx, index):
+        base = self.resolve(index.root)
+        if base is None or not os.path.isdir(base):
+            raise RuntimeError(f"Local mirror of {index.root} not found under {self.mirror_root}")
+        rows = []
+        pending = [(base, index.root)]
+        while pending:
+            local_dir, parent = pending.pop()
+            with os.scandir(local_dir) as it:
+                for e in it:
+                    if e.name.startswith("."):
+                        continue
+                    path = parent + "/" + e.name.lower()
+                    if e.is_dir():
+                        rows.append((path, parent, "folder", e.name, None, None, None, None))
+                        pending.append((e.path, path))
+                    elif e.is_file():
+                        st = e.stat()
+                        modified = datetime.datetime.fromtimestamp(st.st_mtime).isoformat()
+                        # No Dropbox rev for a local file, so its size and mtime stand in for one
+                        rows.append((path, parent, "file", e.name, st.st_size,
+                                     f"local-{st.st_mtime_ns:x}-{st.st_size:x}", None, modified))
+        return index.apply_snapshot(rows)
+
+    def local_copy(self, entry, cache, verify=False):
+        local_path = self.resolve(entry["path_lower"])
+        return local_path if local_path and os.path.isfile(local_path) else None
+
+    def fetch(self, dbx, session, entry, cache, cancelled=None, chunked=None):
+        local_path = self.local_copy(entry, cache)
+        if local_path is None:
+            raise FileNotFoundError(f"{entry['path_lower']} is not in the local mirror")
+        return local_path
+
+
+class HybridStorage(ClipStorage):
+    """Lists over the API but plays the synced local copy whenever it matches the Dropbox version."""
+
+    def __init__(self, mirror_root=LOCAL_MIRROR_ROOT):
+        self.api = DropboxApiStorage()
+        self.mirror = LocalMirrorStorage(mirror_root)
+
+    def sync(self, dbx, index):
+        return self.api.sync(dbx, index)
+
+    def local_copy(self, entry, cache, verify=False):
+        cached = self.api.local_copy(entry, cache)
+        if cached:
+            return cached
+        local_path = self.mirror.local_copy(entry, cache)
+        if local_path is None or os.path.getsize(local_path) != entry["size"]:
+            return None
+        if verify and self.mirror.content_hash(local_path) != entry["content_hash"]:
+            # The sync client hasn't caught up with this version yet
+            return None
+        return local_path
+
+    def fetch(self, dbx, session, entry, cache, cancelled=None, chunked=None):
+        local_path = self.local_copy(entry, cache, verify=True)
+        if local_path:
+            return local_path
+        return self.api.fetch(dbx, session, entry, cache, cancelled, chunked)
+
+
+def make_clip_storage(kind=CLIP_STORAGE):
+    if kind == "dropbox":
+        return DropboxApiStorage()
+    if kind == "local":
+        return LocalMirrorStorage()
+    if kind == "hybrid":
+        return HybridStorage()
+    raise ValueError(f"Unknown clip storage: {kind}")
+
+
+class ClipPrefetcher(QObject):
+    """Downloads a queue of clips into the clip cache, one at a time, at prefetch priority.
+
+    prefetch() replaces the queue; if the clip being downloaded is no longer
+    wanted its job is cancelled so the new queue starts straight away. Running
+    only one prefetch at a time leaves the rest of the pool free for the user.
+    """
+    prefetched = pyqtSignal(str, str, str)  # dropbox_path, local_path, error
+
+    def __init__(self, executor, storage, index, cache, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.storage = storage
+        self.index = index
+        self.cache = cache
+        self.pending = []
+        self.current = None
+        self.request = None
+        self.paused = False
+
+    def prefetch(self, paths):
+        self.pending = [p for p in paths if p != self.current]
+        if self.request is not None and self.current not in paths:
+            print(f"Cancelling prefetch of {self.current}")
+            self.request.cancel()
+            self.request = None
+            self.current = None
+        self.startNext()
+
+    def setPaused(self, paused):
+        # While paused, the current download finishes but no new one is started
+        self.paused = paused
+        self.startNext()
+
+    def startNext(self):
+        while self.request is None and not self.paused and self.pending:
+            path = self.pending.pop(0)
+            entry = self.index.entry(path)
+            if entry is None or self.storage.local_copy(entry, self.cache):
+                continue
+            self.current = path
+            # Shares the download key with user requests, so opening this clip joins the prefetch
+            self.request = self.executor.submit(
+                f"prefetch {path}",
+                lambda dbx, job, e=entry: self.storage.fetch(dbx, self.executor.session, e, self.cache,
+                                                             job.is_cancelled, chunked=None),
+                JobPriority.PREFETCH,
+                lambda local_path, error, p=path: self.onJobDone(p, local_path, error),
+                key=("download", path))
+
+    def onJobDone(self, path, local_path, error):
+        self.request = None
+        self.current = None
+        self.prefetched.emit(path, local_path or "", error)
+        self.startNext()
+
+# ---------- UI components ----------
+
+class DropboxEntryModel(QAbstractListModel):
+    """Flat list of (label, icon, path_lower, rev) grid entries; the view only asks for the rows it paints."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = []
+        self.rows = {}  # path_lower -> row
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        label, icon, path, _ = self.entries[index.row()]
+        if role == Qt.DisplayRole:
+            return label
+        if role == Qt.DecorationRole:
+            return icon
+        if role == Qt.UserRole:
+            return path
+        return None
+
+    def setEntries(self, entries):
+        self.beginResetModel()
+        self.entries = [list(e) for e in entries]
+        self.rows = {e[2]: row for row, e in enumerate(self.entries)}
+        self.endResetModel()
+
+    def applyEntries(self, entries):
+        """Move to entries (in display order) touching only the rows that differ, keyed by path_lower.
+
+        Rows that stay keep their icon, so thumbnails already shown are not lost, unless
+        the file was replaced (a new rev), when the row takes the new entry whole.
+        Returns (inserted, removed, changed) lists of paths, changed being the replaced ones.
+        """
+        wanted = {e[2] for e in entries}
+        current = {e[2] for e in self.entries}
+        if [e[2] for e in self.entries if e[2] in wanted] != [e[2] for e in entries if e[2] in current]:
+            # Kept rows changed order, which a refreshed listing should never do
+            self.setEntries(entries)
+            return [e[2] for e in entries], list(current), []
+
+        removed = [row for row, e in enumerate(self.entries) if e[2] not in wanted]
+        removed_paths = [self.entries[row][2] for row in removed]
+        # Remove contiguous runs from the bottom up so earlier row numbers stay valid
+        for _, run in itertools.groupby(enumerate(reversed(removed)), lambda x: x[0] + x[1]):
+            rows = [row for _, row in run]
+            first, last = rows[-1], rows[0]
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.entries[first:last + 1]
+            self.endRemoveRows()
+
+        # What is left is in display order, so walk the new list inserting runs of unseen paths
+        inserted = []
+        changed = []
+        row = 0
+        i = 0
+        while i < len(entries):
+            if entries[i][2] in current:
+                if self.entries[row][3] != entries[i][3]:
+                    # Overwritten at the same path, so the old thumbnail is of something else
+                    self.entries[row] = list(entries[i])
+                    changed.append(entries[i][2])
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.DecorationRole])
+                elif self.entries[row][0] != entries[i][0]:
+                    self.entries[row][0] = entries[i][0]
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index, [Qt.DisplayRole])
+                row += 1
                 i += 1
+                continue
+            j = i
+            while j < len(entries) and entries[j][2] not in current:
+                j += 1
+            self.beginInsertRows(QModelIndex(), row, row + j - i - 1)
+            self.entries[row:row] = [list(e) for e in entries[i:j]]
+            self.endInsertRows()
+            inserted.extend(e[2] for e in entries[i:j])
+            row += j - i
+            i = j
+        self.rows = {e[2]: row for row, e in enumerate(self.entries)}
+        return inserted, removed_paths, changed
+
+    def path(self, row):
+        return self.entries[row][2]
+
+    def setIcon(self, path, icon):
+        row = self.rows.get(path)
+        if row is None:
+            return
+        self.entries[row][1] = icon
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+
+class DropboxGridListView(QListView):
+    """Icon-mode list laid out as a fixed number of columns.
+
+    Handles the D-pad / HJKL keys itself, since QListView would otherwise swallow letters for
+    type-ahead search. Up (or left) off the first tile hands focus back to the top row buttons;
+    any other key is ignored so it still reaches WebGrid.keyPressEvent.
+    """
+    MOVES = {
+        Qt.Key_Left: QAbstractItemView.MoveLeft, Qt.Key_H: QAbstractItemView.MoveLeft,
+        Qt.Key_Right: QAbstractItemView.MoveRight, Qt.Key_L: QAbstractItemView.MoveRight,
+        Qt.Key_Up: QAbstractItemView.MoveUp, Qt.Key_K: QAbstractItemView.MoveUp,
+        Qt.Key_Down: QAbstractItemView.MoveDown, Qt.Key_J: QAbstractItemView.MoveDown,
+        Qt.Key_PageUp: QAbstractItemView.MovePageUp, Qt.Key_PageDown: QAbstractItemView.MovePageDown,
+        Qt.Key_Home: QAbstractItemView.MoveHome, Qt.Key_End: QAbstractItemView.MoveEnd,
+    }
+
+    def __init__(self, top_row_buttons, icon_size, tile_height, columns=4, parent=None):
+        super().__init__(parent)
+        self.top_row_buttons = top_row_buttons
+        self.columns = columns
+        self.tile_height = tile_height
+        self.setViewMode(QListView.IconMode)
+        self.setFlow(QListView.LeftToRight)
+        self.setWrapping(True)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setWordWrap(True)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setIconSize(icon_size)
+        self.setFocusPolicy(Qt.StrongFocus)
+        # One stylesheet for the whole view rather than one per tile
+        self.setStyleSheet("""
+            QListView {
+                color: white;
+                font-size: 28px;
+                background-color: black;
+                border: none;
+            }
+            QListView::item {
+                padding: 8px;
+            }
+            QListView::item:selected {
+                border: 2px solid #00ffff;
+                background-color: #222;
+            }
+        """)
 
-            with open(local_path, "wb") as f:
-                self.dbx.files_download_to_file(f.name, self.dropbox_path)
-            self.downloaded.emit(self.dropbox_path, local_path, "")
-        except Exception as e:
-            self.downloaded.emit(self.dropbox_path, "", str(e))
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        width = max(1, self.viewport().width() // self.columns)
+        self.setGridSize(QSize(width, self.tile_height))
+
+    def focusInEvent(self, event):
+        if not self.currentIndex().isValid() and self.model() is not None and self.model().rowCount() > 0:
+            self.setCurrentIndex(self.model().index(0, 0))
+        super().focusInEvent(event)
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        current = self.currentIndex()
+        if key in (Qt.Key_Enter, Qt.Key_Return):
+            # Same as WebGrid clicking a focused button
+            if current.isValid():
+                self.clicked.emit(current)
+            return
+        if key not in self.MOVES or event.modifiers() not in (Qt.NoModifier, Qt.KeypadModifier):
+            event.ignore()
+            return
+        if self.top_row_buttons:
+            if key in (Qt.Key_Up, Qt.Key_K) and (not current.isValid() or current.row() < self.columns):
+                self.top_row_buttons[0].setFocus()
+                return
+            if key in (Qt.Key_Left, Qt.Key_H) and (not current.isValid() or current.row() == 0):
+                self.top_row_buttons[-1].setFocus()
+                return
+        index = self.moveCursor(self.MOVES[key], event.modifiers())
+        if index.isValid():
+            self.setCurrentIndex(index)
+            self.scrollTo(index)
+
+    def applyEntries(self, entries):
+        """Diff entries into the model, keeping the tile being looked at in the same place on screen."""
+        model = self.model()
+        bar = self.verticalScrollBar()
+        anchor = None
+        if bar.value() > 0:
+            rows = self.visibleRows()
+            if rows:
+                current = self.currentIndex()
+                row = current.row() if current.isValid() and current.row() in rows else rows[0]
+                anchor = (model.path(row), self.visualRect(model.index(row, 0)).top())
+        inserted, removed, changed = model.applyEntries(entries)
+        if anchor and (inserted or removed):
+            row = model.rows.get(anchor[0])
+            if row is not None:
+                self.doItemsLayout()
+                bar.setValue(bar.value() + self.visualRect(model.index(row, 0)).top() - anchor[1])
+        return inserted, removed, changed
+
+    def visibleRows(self, margin=0):
+        """Rows whose tiles intersect the viewport, grown by margin pixels above and below."""
+        rows = self.model().rowCount() if self.model() is not None else 0
+        if rows == 0:
+            return range(0)
+        area = self.viewport().rect().adjusted(0, -margin, 0, margin)
+        # Tiles are laid out in row order, so bisect for the first one reaching the visible area
+        lo, hi = 0, rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.visualRect(self.model().index(mid, 0)).bottom() < area.top():
+                lo = mid + 1
+            else:
+                hi = mid
+        last = lo
+        while last < rows and self.visualRect(self.model().index(last, 0)).top() <= area.bottom():
+            last += 1
+        return range(lo, last)
 
-# ---------- UI components ----------
 
 class DropboxFolderGridView(QWidget):
     """Grid of folder icons; emits a signal when a folder is clicked."""
@@ -223,104 +1802,75 @@ class DropboxFolderGridView(QWidget):
         super().__init__(parent)
         self.owning_widget = owning_widget
         self.top_row_buttons = top_row_buttons
-        self.folder_buttons = []
-        self.scroll = QScrollArea(self)
-        self.scroll.setWidgetResizable(True)
-        self.container = QWidget()
-        self.grid = QGridLayout(self.container)
-        self.grid.setSpacing(16)
-        self.grid.setContentsMargins(16, 16, 16, 16)
-        self.scroll.setWidget(self.container)
+        self.model = DropboxEntryModel(self)
+        self.list = DropboxGridListView(top_row_buttons, QSize(64, 64), 140)
+        self.list.setModel(self.model)
+        self.list.clicked.connect(self.onActivated)
+        # The list is a single navigation row under the top row buttons; it moves between tiles itself
+        self.folder_buttons = [self.top_row_buttons, [self.list]]
 
         layout = QVBoxLayout(self)
-        layout.addWidget(self.scroll)
+        layout.addWidget(self.list)
 
         # Icon for folders using system icon provider
         self.icon_provider = QFileIconProvider()
         self.folder_icon = self.icon_provider.icon(QFileIconProvider.Folder)
 
-    def parse_date_from_folder(self, name: str):
-        """Extract datetime from folder name like YYYY-MM-DD"""
-        try:
-            return datetime.datetime.strptime(name, "%Y-%m-%d")
-        except Exception:
-            return datetime.datetime.min  # fallback if parsing fails
-    
     def setFolders(self, folders):
-        # folders: list of tuples (name, path_lower)
-        # Sort descending by date (most recent first)
-        folders_sorted = sorted(folders, key=lambda f: self.parse_date_from_folder(f[0]), reverse=True)        
-
-        # Clear grid
-        for i in reversed(range(self.grid.count())):
-            w = self.grid.itemAt(i).widget()
-            if w:
-                w.setParent(None)
-
-        # self.owning_widget.folder_buttons = [self.top_row_buttons]
-        self.folder_buttons = [self.top_row_buttons]
-
-        # Populate grid
-        cols = 4
-        row, col = 0, 0
-        row_buttons = []
-        for name, path in folders_sorted:
-            btn = QToolButton()
-            btn.setIcon(self.folder_icon)
-            btn.setIconSize(QSize(64, 64))
-            btn.setText(name)
-            btn.setToolButtonStyle(Qt.ToolButtonTextUnderIcon)
-            # Apply white text + 28px font
-            btn.setStyleSheet("""
-                QToolButton {
-                    color: white;
-                    font-size: 28px;
-                }
-                QToolButton:focus {
-                    border: 2px solid #00ffff;
-                    background-color: #222;
-                }
-            """)
-            btn.setMinimumSize(120, 120)
-            btn.clicked.connect(lambda checked=False, p=path: self.folderClicked.emit(p))
-
-            self.grid.addWidget(btn, row, col)
-            row_buttons.append(btn)
-            col += 1
-            if col >= cols:
-                # self.owning_widget.folder_buttons.append(row_buttons)
-                self.folder_buttons.append(row_buttons)
-                row_buttons = []
-                col = 0
-                row += 1
+        # folders: list of ClipRecords, shown most recent first
+        self.model.setEntries(self.entriesFor(folders))
+        self.list.scrollToTop()
 
-        if row_buttons:
-            # self.owning_widget.folder_buttons.append(row_buttons)
-            self.folder_buttons.append(row_buttons)
         #Set buttons in owning widget so that navigation works
         self.owning_widget.folder_buttons = self.folder_buttons
-        self.owning_widget.folder_scroll_area = self.scroll
+        self.owning_widget.folder_scroll_area = None
+
+    def updateFolders(self, folders):
+        # Refresh of the folders already shown: only new and deleted folders change, focus stays put
+        self.list.applyEntries(self.entriesFor(folders))
+        self.owning_widget.folder_buttons = self.folder_buttons
+        self.owning_widget.folder_scroll_area = None
+
+    def entriesFor(self, folders):
+        return [(f.name, self.folder_icon, f.path, f.rev) for f in ClipRecord.newest_first(folders)]
+
+    def onActivated(self, index):
+        path = index.data(Qt.UserRole)
+        if path:
+            self.folderClicked.emit(path)
 
 
 class DropboxFileGridView(QWidget):
     """Grid of files with icons. Video files show parsed date/time labels."""
     fileClicked = pyqtSignal(str)
+    fileFocused = pyqtSignal(str)
+    thumbnailsWanted = pyqtSignal(list)  # paths of video tiles on (or about to come on) screen
 
     def __init__(self, owning_widget, top_row_buttons, parent=None):
         super().__init__(parent)
         self.owning_widget = owning_widget
         self.top_row_buttons = top_row_buttons
-        self.folder_buttons = []
-        self.scroll = QScrollArea(self)
-        self.scroll.setWidgetResizable(True)
-        self.container = QWidget()
-        self.grid = QGridLayout(self.container)
-        self.grid.setSpacing(16)
-        self.grid.setContentsMargins(16, 16, 16, 16)
-        self.scroll.setWidget(self.container)
+        self.paths = []  # In display order, used to pick neighbouring clips to prefetch
+        self.video_paths = set()  # Tiles that can take a thumbnail
+        self.show_dates = False
+        self.grouped = False  # One tile per incident rather than per clip
+        self.incidents = {}  # First clip path -> paths of the incident's clips in time order, when grouped
+        self.model = DropboxEntryModel(self)
+        self.list = DropboxGridListView(top_row_buttons, QSize(192, 108), 200)
+        self.list.setModel(self.model)
+        self.list.clicked.connect(self.onActivated)
+        self.list.selectionModel().currentChanged.connect(self.onCurrentChanged)
+        self.folder_buttons = [self.top_row_buttons, [self.list]]
+
+        # Ask for thumbnails once scrolling settles
+        self.thumbnail_timer = QTimer(self)
+        self.thumbnail_timer.setSingleShot(True)
+        self.thumbnail_timer.setInterval(150)
+        self.thumbnail_timer.timeout.connect(self.requestVisibleThumbnails)
+        self.list.verticalScrollBar().valueChanged.connect(lambda _: self.thumbnail_timer.start())
 
         layout = QVBoxLayout(self)
-        layout.addWidget(self.scroll)
+        layout.addWidget(self.list)
 
         # Icons 
         # Provided by Icons 8 <a target="_blank" href="https://icons8.com/icon/35090/video">Video</a> icon by <a target="_blank" href="https://icons8.com">Icons8</a>
@@ -330,99 +1880,137 @@ class DropboxFileGridView(QWidget):
         self.video_icon = QIcon(":/icons/icons/icons8-video-100.png")
         self.doc_icon = QIcon.fromTheme("text-x-generic") or self.file_icon
 
-    def parse_datetime_from_name(self, name: str):
-        """Extract datetime from filename like YYYYMMDD'T'HHMISS-cameraname.ext"""
-        try:
-            stem = Path(name).stem
-            datepart = stem.split("-", 1)[0]
-            return datetime.datetime.strptime(datepart, "%Y%m%dT%H%M%S")
-        except Exception:
-            return datetime.datetime.min  # fallback for non-matching names
-
-    def setFiles(self, files):
-        files_sorted = sorted(files, key=lambda f: self.parse_datetime_from_name(f[0]), reverse=True)        
-        # Clear grid
-        for i in reversed(range(self.grid.count())):
-            w = self.grid.itemAt(i).widget()
-            if w:
-                w.setParent(None)
-
-        self.folder_buttons = [self.top_row_buttons]
-
-        # Populate grid
-        cols = 4
-        row, col = 0, 0
-        row_buttons = []
-        for name, path in files_sorted:
-            ext = Path(name).suffix.lower()
-
+    def setFiles(self, files, show_dates=False):
+        # show_dates for clips from more than one day, such as event query results
+        self.show_dates = show_dates
+        self.model.setEntries(self.entriesFor(files))
+        self.list.scrollToTop()
+            
+        #Set buttons in owning widget so that navigation works
+        self.owning_widget.folder_buttons = self.folder_buttons
+        self.owning_widget.folder_scroll_area = None
+        self.thumbnail_timer.start()
+
+    def updateFiles(self, files):
+        """Refresh of the folder already shown: new clips slot in without moving the focused tile."""
+        inserted, removed, changed = self.list.applyEntries(self.entriesFor(files))
+        if inserted or changed:
+            self.thumbnail_timer.start()
+
+    def entriesFor(self, files):
+        self.incidents = {}
+        labels = {}
+        if self.grouped:
+            # One tile per incident, standing in for (and keyed by) its first clip
+            tiles = [f for f in files if not f.is_video]
+            for incident in group_incidents([f for f in files if f.is_video]):
+                head = incident[0]
+                tiles.append(head)
+                self.incidents[head.path] = [r.path for r in incident]
+                if len(incident) > 1:
+                    cameras = sorted({r.camera_name or r.name for r in incident})
+                    labels[head.path] = f"{head.time_label(self.show_dates)}: {', '.join(cameras)} ({len(incident)} clips)"
+            files = tiles
+        files_sorted = ClipRecord.newest_first(files)
+        self.paths = [f.path for f in files_sorted]
+        self.video_paths = set()
+
+        entries = []
+        for f in files_sorted:
             # Decide icon + label
-            if ext in (".mp4", ".mpeg", ".mpg", ".m4v"):
+            if f.is_video:
                 icon = self.video_icon
-                label_text = name
-                try:
-                    stem = Path(name).stem
-                    # Split into datepart and camera name
-                    datepart, cameraname = stem.split("-", 1)
-                    dt = datetime.datetime.strptime(datepart, "%Y%m%dT%H%M%S")
-                    # label_text = f"{cameraname} at {dt.strftime('%d %b %Y, %H:%M:%S')}"
-                    label_text = f"{cameraname} at {dt.strftime('%H:%M:%S')}"
-                except Exception:
-                    pass
-            elif ext in (".txt", ".md", ".pdf", ".doc", ".docx"):
+                self.video_paths.add(f.path)
+            elif f.ext in DOC_EXTENSIONS:
                 icon = self.doc_icon
-                label_text = name
             else:
                 icon = self.file_icon
-                label_text = name
-
-            # Create button
-            btn = QToolButton()
-            btn.setIcon(icon)
-            btn.setIconSize(QSize(64, 64))
-            btn.setText(label_text)
-            btn.setToolButtonStyle(Qt.ToolButtonTextUnderIcon)
-            btn.setMinimumSize(160, 140)
-            btn.setStyleSheet("""
-                QToolButton {
-                    color: white;
-                    font-size: 28px;
-                }
-            """)
-            btn.clicked.connect(lambda checked=False, p=path: self.fileClicked.emit(p))
-
-            self.grid.addWidget(btn, row, col)
-            row_buttons.append(btn)
-            col += 1
-            if col >= cols:
-                # self.owning_widget.folder_buttons.append(row_buttons)
-                self.folder_buttons.append(row_buttons)
-                row_buttons = []
-                col = 0
-                row += 1
-        if row_buttons:
-            # self.owning_widget.folder_buttons.append(row_buttons)
-            self.folder_buttons.append(row_buttons)
-            
-        #Set buttons in owning widget so that navigation works
-        self.owning_widget.folder_buttons = self.folder_buttons
-        self.owning_widget.folder_scroll_area = self.scroll
+            entries.append((labels.get(f.path) or f.label(self.show_dates), icon, f.path, f.rev))
+        return entries
+
+    def requestVisibleThumbnails(self):
+        # Tiles in the viewport plus a row either side, so scrolling finds them ready
+        paths = [self.model.path(row) for row in self.list.visibleRows(margin=200)]
+        paths = [path for path in paths if path in self.video_paths]
+        if paths:
+            self.thumbnailsWanted.emit(paths)
+
+    def setThumbnail(self, path, thumb_path):
+        if path in self.video_paths:
+            self.model.setIcon(path, QIcon(thumb_path))
+
+    def onCurrentChanged(self, current, previous):
+        path = current.data(Qt.UserRole)
+        if path:
+            self.fileFocused.emit(path)
 
+    def neighbours(self, path, after=PREFETCH_NEXT, before=PREFETCH_PREVIOUS):
+        """Paths of the clips either side of path in display order, nearest first."""
+        try:
+            i = self.paths.index(path)
+        except ValueError:
+            return []
+        return self.paths[i + 1:i + 1 + after] + self.paths[max(0, i - before):i][::-1]
 
-    def onActivated(self, item):
-        path = item.data(Qt.UserRole)
+    def onActivated(self, index):
+        path = index.data(Qt.UserRole)
         if path:
             self.fileClicked.emit(path)
 
 class SecurityVideoWindow(QWidget):
+    thumbnailGenerated = pyqtSignal(str, str, str, str)  # path, rev, thumbnail path, error - from the thumbnail pool
+
     def __init__(self, owning_widget, parent_layout, parent=None):
         super().__init__(parent)
 
         self.owning_widget = owning_widget
         self.parent_layout = parent_layout
 
-        dropbox_token = self.read_dropbox_token()
-        self.dbx = dropbox.Dropbox(dropbox_token)
+        self.storage = make_clip_storage()
+        if self.storage.remote:
+            dropbox_token = self.read_dropbox_token()
+        else:
+            try:
+                dropbox_token = self.read_dropbox_token()
+            except RuntimeError:
+                dropbox_token = None
+        self.executor = DropboxExecutor(dropbox_token, parent=self)
+        self.dbx = self.executor.dbx
+        self.index = ClipIndex()
+        self.clip_records = {}  # path_lower -> ClipRecord, so each listing entry is parsed once
+        self.events = ClipEventStore()  # Every clip across all days, rebuilt after index changes
+        self.events_stale = True
+        self.events_job = None
+        self.current_query = None  # Filters behind the file grid when it shows event query results
+        self.playing_path = None
+        self.play_queue = []  # Rest of the incident being played, in order
+        self.review_paths = []  # Clips of a day review, oldest first
+        self.review_pos = -1
+        self.review_preloaded = None  # Path loaded into the standby player
+        self.review_ready = {}  # Path -> local copy, for review clips that came from outside the cache
+        self.cache = ClipCache()
+        self.thumbnails = ThumbnailCache()
+        self.thumbnails_requested = set()  # (path, rev) with a job in flight
+        self.thumbnails_unavailable = set()  # paths Dropbox has no thumbnail for, made locally once cached
+        self.thumbnail_pool = ThreadPoolExecutor(max_workers=THUMBNAIL_WORKERS, thread_name_prefix="thumbnail")
+        self.thumbnail_jobs = []  # Futures for the view on screen, cancelled when it goes
+        self.thumbnailGenerated.connect(self.onThumbnailGenerated)
+        QApplication.instance().aboutToQuit.connect(
+            lambda: self.thumbnail_pool.shutdown(wait=False, cancel_futures=True))
+        self.sheets = ContactSheets(parent=self)
+        self.sheets.ready.connect(self.onContactSheet)
+        QApplication.instance().aboutToQuit.connect(self.sheets.shutdown)
+        self.scrub_path = None  # Clip whose contact sheet frames the player is previewing
+        self.prefetcher = ClipPrefetcher(self.executor, self.storage, self.index, self.cache, parent=self)
+        self.prefetcher.prefetched.connect(self.onPrefetched)
+        self.awaiting_download = None
+        self.streaming_path = None
+        self.view_generation = 0  # Bumped on every navigation so late results for old views are dropped
+        self.view_requests = []  # Requests made for the view on screen, cancelled when it goes
+        self.sync_job = None
+        self.sync_pending = False
+        self.folder_root = DROPBOX_ROOT_PATH
+        self.current_folder = None
         owning_widget.mode = Mode.SECURITY_CAMERA_FOLDER
 
         self.top_row_buttons = []
@@ -465,6 +2053,28 @@ class SecurityVideoWindow(QWidget):
         back_button.clicked.connect(lambda: self.onBack())
         breadcrumb_layout.addWidget(back_button)
         self.top_row_buttons.append(back_button)
+
+        self.group_button = QPushButton("Group Incidents")
+        self.group_button.setFocusPolicy(Qt.StrongFocus)
+        self.group_button.setStyleSheet(back_button.styleSheet())
+        self.group_button.clicked.connect(lambda: self.toggleIncidents())
+        breadcrumb_layout.addWidget(self.group_button)
+        self.top_row_buttons.append(self.group_button)
+
+        review_button = QPushButton("Review All")
+        review_button.setFocusPolicy(Qt.StrongFocus)
+        review_button.setStyleSheet(back_button.styleSheet())
+        review_button.clicked.connect(lambda: self.startDayReview())
+        breadcrumb_layout.addWidget(review_button)
+        self.top_row_buttons.append(review_button)
+
+        if ClipEventStore.available:
+            overnight_button = QPushButton("Overnight")
+            overnight_button.setFocusPolicy(Qt.StrongFocus)
+            overnight_button.setStyleSheet(back_button.styleSheet())
+            overnight_button.clicked.connect(lambda: self.showOvernight())
+            breadcrumb_layout.addWidget(overnight_button)
+            self.top_row_buttons.append(overnight_button)
         
         self.parent_layout.addWidget(breadcrumb_bar)
         # self.owning_widget.folder_buttons.append(self.top_row_buttons)
@@ -476,13 +2086,20 @@ class SecurityVideoWindow(QWidget):
         self.stack.addWidget(self.folderView)  # index 0
         self.stack.addWidget(self.fileView)    # index 1
         self.player = QMediaPlayer(self, QMediaPlayer.VideoSurface)
-        self.playview = VideoPlayerWidget(self.player)
+        self.standby_player = QMediaPlayer(self, QMediaPlayer.VideoSurface)  # Next clip of a day review
+        for player in (self.player, self.standby_player):
+            player.mediaStatusChanged.connect(self.onPlayerStatus)
+            player.durationChanged.connect(self.onDurationChanged)
+        self.playview = VideoPlayerWidget(self.player, standby_player=self.standby_player)
 
         self.stack.addWidget(self.playview) # index 2
 
         # Connections
         self.folderView.folderClicked.connect(self.openFolder)
         self.fileView.fileClicked.connect(self.openFile)
+        self.fileView.fileFocused.connect(self.prefetchAround)
+        self.fileView.thumbnailsWanted.connect(self.onThumbnailsWanted)
+        self.stack.currentChanged.connect(self.onViewChanged)
 
         camera_button.setFocus()
         # Load folders
@@ -512,13 +2129,24 @@ class SecurityVideoWindow(QWidget):
         idx = self.stack.currentIndex()
         if idx == 2:
             # From video -> stop and go to files
-            self.owning_widget.player.stop()
+            self.play_queue = []
+            self.endDayReview()
+            if self.owning_widget.player is not None:
+                self.owning_widget.player.stop()
+            self.player.stop()
+            self.endStreaming()
             self.owning_widget.mode = Mode.SECURITY_CAMERA_FOLDER
             self.stack.setCurrentIndex(1)
             self.owning_widget.folder_buttons = self.fileView.folder_buttons
+            self.fileView.list.setFocus()
+            self.fileView.thumbnail_timer.start()
         elif idx == 1:
-            # From files -> go to folders
-            self.owning_widget.folder_buttons = self.folderView.folder_buttons
+            # From files -> go to folders, picking up any folders added while we were away
+            self.current_folder = None
+            self.current_query = None
+            self.prefetcher.prefetch([])
+            self.folderView.updateFolders(self.folderEntries(self.folder_root))
+            self.folderView.list.setFocus()
             self.stack.setCurrentIndex(0)
         elif idx == 0:
             #Top level, go back to camera grid
@@ -539,13 +2167,86 @@ class SecurityVideoWindow(QWidget):
     #                 self.showNormal()
     #     super().keyPressEvent(event)
 
+    def onViewChanged(self, index):
+        # Anything still in flight for the old view is no longer wanted
+        self.view_generation += 1
+        for request in self.view_requests:
+            request.cancel()
+        self.view_requests = []
+        for future in self.thumbnail_jobs:
+            future.cancel()
+        self.thumbnail_jobs = []
+        self.thumbnails_requested.clear()
+        if self.awaiting_download:
+            self.awaiting_download = None
+            self.prefetcher.setPaused(False)
+
     # ---------- Dropbox interactions ----------
+    def submitForView(self, name, fn, priority, callback, key):
+        """Submit a job whose result is only wanted while the current view is on screen."""
+        generation = self.view_generation
+
+        def deliver(result, error):
+            if generation != self.view_generation:
+                print(f"Discarding result of {name} for a view that has gone")
+                return
+            callback(result, error)
+
+        request = self.executor.submit(name, fn, priority, deliver, key=key)
+        self.view_requests = [r for r in self.view_requests if not r.is_done()] + [request]
+        return request
+
     def loadFolders(self, path):
-        # Shows only folders at the given path
-        # self.statusBar().showMessage(f"Loading folders in {path}...")
-        worker = DropboxListWorker(self.dbx, path, list_folders_only=True, parent=self)
-        worker.listed.connect(self.onFoldersListed)
-        worker.start()
+        # Shows only folders at the given path, straight from the local index
+        self.folder_root = path
+        self.onFoldersListed(path, self.folderEntries(path), "")
+        self.syncIndex()
+
+    def records(self, path, list_folders_only=False):
+        """ClipRecords for the children of path, parsing only entries not seen before (or with a new rev)."""
+        records = []
+        for kind, name, p, size, rev, duration_ms in self.index.list_children(path, list_folders_only):
+            record = self.clip_records.get(p)
+            if record is None or record.rev != rev or record.name != name:
+                record = self.clip_records[p] = ClipRecord(kind, name, p, size, rev, duration_ms)
+            elif duration_ms is not None:
+                record.duration_ms = duration_ms
+            records.append(record)
+        return records
+
+    def folderEntries(self, path):
+        return self.records(path, list_folders_only=True)
+
+    def fileEntries(self, path):
+        return [r for r in self.records(path) if r.kind == "file"]
+
+    def syncIndex(self):
+        # Fetch only the changes since the last sync; the views are refreshed when it completes
+        if self.sync_job is not None and not self.sync_job.is_done():
+            self.sync_pending = True
+            return
+        self.sync_job = self.executor.submit(
+            "index sync", lambda dbx, job: self.storage.sync(dbx, self.index), JobPriority.SYNC,
+            lambda changed, error: self.onIndexSynced(changed or set(), error))
+
+    def onIndexSynced(self, changed, error):
+        if self.sync_pending:
+            self.sync_pending = False
+            self.syncIndex()
+        if changed or self.events_stale:
+            self.loadEvents()
+        if error:
+            print(f"Clip index sync failed: {error}")
+            if not self.index.is_populated():
+                QMessageBox.critical(self, "Dropbox error", error)
+            return
+        # Only update the view that is on screen, the others are refreshed when navigated to
+        idx = self.stack.currentIndex()
+        if idx == 0 and self.folder_root in changed:
+            self.folderView.updateFolders(self.folderEntries(self.folder_root))
+        elif idx in (1, 2) and self.current_folder in changed:
+            # Also while a clip plays, so the day view is current when going back to it
+            self.fileView.updateFiles(self.fileEntries(self.current_folder))
 
     @pyqtSlot(str, list, str)
     def onFoldersListed(self, path, entries, error):
@@ -553,17 +2254,88 @@ class SecurityVideoWindow(QWidget):
             QMessageBox.critical(self, "Dropbox error", error)
             # self.statusBar().clearMessage()
             return
-        # Transform to (name, path) for folders
-        folders = [(name, p) for kind, name, p in entries if kind == "folder"]
+        folders = [r for r in entries if r.kind == "folder"]
         self.folderView.setFolders(folders)
         self.stack.setCurrentIndex(0)
         # self.statusBar().clearMessage()
 
+    # ---------- Event queries ----------
+    def loadEvents(self):
+        if not ClipEventStore.available:
+            return
+        if self.events_job is not None and not self.events_job.is_done():
+            self.events_stale = True  # Loaded again once this one finishes
+            return
+        self.events_stale = False
+        known = dict(self.clip_records)
+        self.events_job = self.executor.submit(
+            "event store load", lambda dbx, job: ClipEventStore.load(self.index, known), JobPriority.SYNC,
+            self.onEventsLoaded)
+
+    def onEventsLoaded(self, events, error):
+        if error:
+            print(f"Event store load failed: {error}")
+            self.events_stale = True
+            return
+        self.events = events
+        print(f"Event store: {len(events)} clips, busiest hours {events.busiest_hours()}")
+        if self.events_stale:
+            self.loadEvents()
+        if self.current_query is not None and self.stack.currentIndex() in (1, 2):
+            self.fileView.updateFiles(self.queryRecords(self.current_query))
+
+    def queryRecords(self, filters):
+        start = time.perf_counter()
+        rows = self.events.query(**filters)
+        records = self.events.records_for(rows)
+        print(f"Event query {filters}: {len(records)} clips in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return records
+
+    def showQuery(self, **filters):
+        """Show the clips matching an event query (see ClipEventStore.query) in the file grid."""
+        self.current_folder = None
+        self.current_query = filters
+        self.fileView.setFiles(self.queryRecords(filters), show_dates=True)
+        self.stack.setCurrentIndex(1)
+        self.fileView.list.setFocus()
+
+    # ---------- Incidents ----------
+    def toggleIncidents(self):
+        self.fileView.grouped = not self.fileView.grouped
+        self.group_button.setText("All Clips" if self.fileView.grouped else "Group Incidents")
+        if self.current_query is not None:
+            self.fileView.setFiles(self.queryRecords(self.current_query), show_dates=True)
+        elif self.current_folder is not None:
+            self.fileView.setFiles(self.fileEntries(self.current_folder))
+
+    def playIncident(self, paths):
+        # Play the first clip now, the rest follow on from onPlayerStatus and are prefetched meanwhile
+        self.play_queue = list(paths[1:])
+        self.downloadAndPlay(paths[0])
+
+    def playNextInIncident(self):
+        if self.play_queue and self.stack.currentIndex() == 2:
+            self.downloadAndPlay(self.play_queue.pop(0))
+
+    def showOvernight(self):
+        begin, end = OVERNIGHT_HOURS
+        self.showQuery(start=ClipRecord.now() - OVERNIGHT_DAYS * 86400, time_of_day=(begin * 3600, end * 3600))
+
+    def onDurationChanged(self, duration_ms):
+        # Clip lengths are only known once played; kept for the event store
+        if self.sender() is not self.player:
+            return
+        if self.playing_path and duration_ms > 0:
+            entry = self.index.entry(self.playing_path)
+            if entry:
+                self.index.set_duration(self.playing_path, entry["rev"], duration_ms)
+            self.playing_path = None
+
     def openFolder(self, path):
-        # self.statusBar().showMessage(f"Loading files in {path}...")
-        worker = DropboxListWorker(self.dbx, path, list_folders_only=False, parent=self)
-        worker.listed.connect(self.onFilesListed)
-        worker.start()
+        self.current_folder = path
+        self.current_query = None
+        self.onFilesListed(path, self.fileEntries(path), "")
+        self.syncIndex()
 
     @pyqtSlot(str, list, str)
     def onFilesListed(self, path, entries, error):
@@ -571,7 +2343,7 @@ class SecurityVideoWindow(QWidget):
             QMessageBox.critical(self, "Dropbox error", error)
             # self.statusBar().clearMessage()
             return
-        files = [(name, p) for kind, name, p in entries if kind == "file"]
+        files = [r for r in entries if r.kind == "file"]
         self.fileView.setFiles(files)
         self.stack.setCurrentIndex(1)
         # self.statusBar().clearMessage()
@@ -579,27 +2351,352 @@ class SecurityVideoWindow(QWidget):
     def openFile(self, path):
         name = Path(path).name.lower()
         ext = Path(name).suffix
-        is_video = ext.lower() in (".mp4", ".mpeg", ".mpg", ".m4v")
-        if is_video:
+        is_video = ext.lower() in VIDEO_EXTENSIONS
+        incident = self.fileView.incidents.get(path)
+        if incident and len(incident) > 1:
+            self.playIncident(incident)
+        elif is_video:
+            self.play_queue = []
             self.downloadAndPlay(path)
         else:
             QMessageBox.information(self, "File selected", f"Selected file:\n{path}")
 
     def downloadAndPlay(self, dropbox_path):
+        self.playing_path = dropbox_path
+        # Play straight from the clip cache if we already have this revision
+        entry = self.index.entry(dropbox_path)
+        local_path = self.cache.get(entry["content_hash"]) if entry else None
+        if local_path:
+            self.onDownloaded(dropbox_path, local_path, "")
+            return
+        self.awaiting_download = dropbox_path
+        self.prefetcher.setPaused(True)
+        if entry is not None and not isinstance(self.storage, DropboxApiStorage):
+            # See whether the sync client already has it; checking the local copy reads the whole file
+            self.submitForView(
+                f"local copy {dropbox_path}",
+                lambda dbx, job: self.storage.local_copy(entry, self.cache, verify=True), JobPriority.USER,
+                lambda local_path, error: self.onLocalCopyChecked(dropbox_path, entry, local_path, error),
+                key=("local", dropbox_path))
+            return
+        self.openRemote(dropbox_path, entry)
+
+    def onLocalCopyChecked(self, dropbox_path, entry, local_path, error):
+        if local_path:
+            self.onDownloaded(dropbox_path, local_path, "")
+        else:
+            self.openRemote(dropbox_path, entry)
+
+    def openRemote(self, dropbox_path, entry):
+        if (STREAM_PLAYBACK and self.storage.remote and entry and (entry["size"] or 0) >= STREAM_MIN_BYTES
+                and self.prefetcher.current != dropbox_path):
+            # Big clip - start playing from a direct link rather than waiting for the whole file
+            self.submitForView(
+                f"temporary link {dropbox_path}",
+                lambda dbx, job: dbx.files_get_temporary_link(dropbox_path).link, JobPriority.USER,
+                lambda url, error: self.onLinked(dropbox_path, url or "", error),
+                key=("link", dropbox_path))
+            return
+        # If this clip is already being prefetched (or was asked for twice) this joins that download
+        self.startDownload(dropbox_path)
+
+    def startDownload(self, dropbox_path, chunked=None):
         # self.statusBar().showMessage(f"Downloading {dropbox_path}...")
-        worker = DropboxDownloadWorker(self.dbx, dropbox_path, parent=self)
-        worker.downloaded.connect(self.onDownloaded)
-        worker.start()
+        entry = self.index.entry(dropbox_path) or {"path_lower": dropbox_path.lower(), "size": None, "content_hash": None}
+        self.submitForView(
+            f"download {dropbox_path}",
+            lambda dbx, job: self.storage.fetch(dbx, self.executor.session, entry, self.cache,
+                                                job.is_cancelled, chunked=chunked),
+            JobPriority.USER,
+            lambda local_path, error: self.onDownloaded(dropbox_path, local_path or "", error),
+            key=("download", dropbox_path))
+
+    def onLinked(self, dropbox_path, url, error):
+        if dropbox_path != self.awaiting_download:
+            return
+        if error:
+            print(f"No temporary link for {dropbox_path}, downloading instead: {error}")
+            self.startDownload(dropbox_path)
+            return
+        self.awaiting_download = None
+        # Cache the streamed clip once its neighbours are in, so a replay is local. The prefetcher
+        # stays paused until the stream has buffered so it doesn't compete for the uplink.
+        self.streaming_path = dropbox_path
+        self.prefetcher.prefetch((self.play_queue or self.fileView.neighbours(dropbox_path)) + [dropbox_path])
+        self.playUrl(QUrl(url))
+
+    def onPlayerStatus(self, status):
+        if self.sender() is not self.player:
+            return  # Standby player prerolling the next review clip
+        if self.owning_widget.mode == Mode.DAY_REVIEW:
+            if status in (QMediaPlayer.EndOfMedia, QMediaPlayer.InvalidMedia):
+                self.reviewStep(1)
+            return
+        if self.streaming_path and status in (QMediaPlayer.BufferedMedia, QMediaPlayer.EndOfMedia, QMediaPlayer.InvalidMedia):
+            self.endStreaming()
+        if status in (QMediaPlayer.EndOfMedia, QMediaPlayer.InvalidMedia):
+            self.playNextInIncident()
+
+    def endStreaming(self):
+        if self.streaming_path:
+            self.streaming_path = None
+            self.prefetcher.setPaused(False)
+
+    # ---------- Day review ----------
+    def reviewPaths(self):
+        """Every clip in the file grid (a day, or event query results), oldest first, incidents expanded."""
+        paths = []
+        for path in reversed(self.fileView.paths):
+            if path in self.fileView.video_paths:
+                paths.extend(self.fileView.incidents.get(path, [path]))
+        return paths
+
+    def startDayReview(self):
+        if self.stack.currentIndex() != 1:
+            return  # Reviews what the file grid shows
+        paths = self.reviewPaths()
+        if not paths:
+            return
+        focused = self.fileView.list.currentIndex().data(Qt.UserRole)
+        self.review_paths = paths
+        self.review_ready = {}
+        self.review_preloaded = None
+        self.play_queue = []
+        self.playview.rewind_at_end = False
+        self.playview.speedButton.show()
+        self.reviewClip(paths.index(focused) if focused in paths else 0)
+
+    def endDayReview(self):
+        if not self.review_paths:
+            return
+        self.review_paths = []
+        self.review_pos = -1
+        self.review_preloaded = None
+        self.review_ready = {}
+        self.standby_player.stop()
+        self.standby_player.setMedia(QMediaContent())
+        self.playview.rewind_at_end = True
+        self.playview.speedButton.hide()
+        self.playview.setRate(1)
+
+    def reviewClip(self, pos):
+        """Play review clip pos, switching straight to the standby player if it was preloaded."""
+        self.review_pos = pos
+        path = self.review_paths[pos]
+        self.playing_path = path
+        self.owning_widget.mode = Mode.DAY_REVIEW
+        self.stack.setCurrentIndex(2)
+        if self.review_preloaded == path:
+            self.playview.swapPlayers()
+            self.player, self.standby_player = self.playview.player, self.playview.standby
+            self.player.play()
+            self.standby_player.stop()
+        else:
+            self.player.stop()
+            local_path = self.reviewLocalPath(path)
+            if local_path:
+                self.playReviewFile(path, local_path)
+            else:
+                entry = self.index.entry(path) or {"path_lower": path, "size": None, "content_hash": None}
+                self.submitForView(
+                    f"review {path}",
+                    lambda dbx, job: self.storage.fetch(dbx, self.executor.session, entry, self.cache,
+                                                        job.is_cancelled),
+                    JobPriority.USER,
+                    lambda local_path, error: self.onReviewFetched(path, local_path, error),
+                    key=("download", path))
+        self.review_preloaded = None
+        self.showScrubFrames(path)
+        self.prefetcher.prefetch(self.review_paths[pos + 1:pos + 1 + PREFETCH_NEXT])
+        self.preloadNextReviewClip()
+
+    def reviewLocalPath(self, path):
+        if path in self.review_ready:
+            return self.review_ready[path]
+        entry = self.index.entry(path)
+        return self.cache.peek(entry["content_hash"]) if entry else None
+
+    def onReviewFetched(self, path, local_path, error):
+        if error or not local_path:
+            print(f"Review clip {path} unavailable, skipping: {error}")
+            if self.review_paths and self.review_paths[self.review_pos] == path:
+                self.reviewStep(1)
+            return
+        self.review_ready[path] = local_path
+        if self.review_paths and self.review_paths[self.review_pos] == path:
+            self.playReviewFile(path, local_path)
+        self.preloadNextReviewClip()
+
+    def playReviewFile(self, path, local_path):
+        self.player.setMedia(QMediaContent(QUrl.fromLocalFile(local_path)))
+        self.player.setPlaybackRate(self.playview.rate)
+        self.player.play()
+
+    def preloadNextReviewClip(self):
+        pos = self.review_pos + 1
+        if not self.review_paths or pos >= len(self.review_paths):
+            return
+        path = self.review_paths[pos]
+        if path == self.review_preloaded:
+            return
+        local_path = self.reviewLocalPath(path)
+        if local_path:
+            self.standby_player.setMedia(QMediaContent(QUrl.fromLocalFile(local_path)))
+            self.standby_player.setPlaybackRate(self.playview.rate)
+            # Pausing prerolls the pipeline to the first frame, so the switch at the end of this clip has no gap
+            self.standby_player.pause()
+            self.review_preloaded = path
+
+    def reviewStep(self, step):
+        """Move step clips through the review; past the last clip goes back to the file grid."""
+        pos = self.review_pos + step
+        if pos >= len(self.review_paths):
+            self.onBack()
+        elif self.review_paths:
+            self.reviewClip(max(0, pos))
+
+    def reviewSpeed(self, step):
+        self.playview.stepRate(step)
+
+    def prefetchAround(self, path):
+        # Get the focused clip and its neighbours into the cache while the current one plays. For an
+        # incident that is its clips, in the order they will play.
+        if self.play_queue:
+            self.prefetcher.prefetch([path] + self.play_queue)
+        elif path in self.fileView.incidents and len(self.fileView.incidents[path]) > 1:
+            self.prefetcher.prefetch(self.fileView.incidents[path])
+        else:
+            self.prefetcher.prefetch([path] + self.fileView.neighbours(path))
+
+    # ---------- Thumbnails ----------
+    def onThumbnailsWanted(self, paths):
+        batch = []
+        for path in paths:
+            entry = self.index.entry(path)
+            if entry is None or entry["kind"] != "file":
+                continue
+            # A contact sheet says more than a thumbnail; make one for clips already in the cache
+            sheet_path = self.sheets.get(entry["content_hash"])
+            if sheet_path:
+                self.fileView.setThumbnail(path, sheet_path)
+                continue
+            clip_path = self.cache.peek(entry["content_hash"])
+            if clip_path:
+                self.sheets.request(path, entry["content_hash"], clip_path)
+            thumb_path = self.thumbnails.get(path, entry["rev"])
+            if thumb_path:
+                self.fileView.setThumbnail(path, thumb_path)
+                continue
+            key = (path, entry["rev"])
+            if key in self.thumbnails_requested:
+                continue
+            if path in self.thumbnails_unavailable or not self.storage.remote:
+                clip_path = self.storage.local_copy(entry, self.cache)
+                if clip_path:
+                    self.generateThumbnail(path, entry["rev"], clip_path)
+                continue
+            self.thumbnails_requested.add(key)
+            batch.append(key)
+        for i in range(0, len(batch), THUMBNAIL_BATCH_SIZE):
+            entries = batch[i:i + THUMBNAIL_BATCH_SIZE]
+            self.submitForView(
+                f"thumbnails x{len(entries)}",
+                lambda dbx, job, e=entries: fetch_thumbnail_batch(dbx, self.thumbnails, e),
+                JobPriority.THUMBNAIL,
+                lambda fetched, error, e=entries: self.onThumbnailsFetched(e, fetched or {}, error),
+                key=("thumbnails", tuple(entries)))
+
+    def onThumbnailsFetched(self, entries, fetched, error):
+        if error:
+            print(f"Thumbnail batch failed: {error}")
+        for path, rev in entries:
+            self.thumbnails_requested.discard((path, rev))
+            if path in fetched:
+                self.fileView.setThumbnail(path, fetched[path])
+            elif not error:
+                # No server-side thumbnail for this one, so make one from the clip when we have it
+                self.thumbnails_unavailable.add(path)
+                entry = self.index.entry(path)
+                clip_path = self.storage.local_copy(entry, self.cache) if entry else None
+                if clip_path:
+                    self.generateThumbnail(path, rev, clip_path)
+
+    def generateThumbnail(self, path, rev, clip_path):
+        key = (path, rev)
+        if key in self.thumbnails_requested:
+            return
+        self.thumbnails_requested.add(key)
+        # ffmpeg gets its own pool so a folder of clips doesn't hold up the Dropbox workers
+        future = self.thumbnail_pool.submit(generate_thumbnail, self.thumbnails, path, rev, clip_path)
+        future.add_done_callback(lambda f: self.thumbnailFinished(path, rev, f))
+        self.thumbnail_jobs = [f for f in self.thumbnail_jobs if not f.done()] + [future]
+
+    def thumbnailFinished(self, path, rev, future):
+        # Called on the pool's thread, so hand over to the UI thread through a signal
+        if future.cancelled():
+            return
+        error = future.exception()
+        self.thumbnailGenerated.emit(path, rev, "" if error else future.result() or "", str(error or ""))
+
+    @pyqtSlot(str, str, str, str)
+    def onThumbnailGenerated(self, path, rev, thumb_path, error):
+        self.thumbnails_requested.discard((path, rev))
+        if thumb_path:
+            self.thumbnails_unavailable.discard(path)
+            self.fileView.setThumbnail(path, thumb_path)
+        elif error:
+            print(f"Could not make a thumbnail for {path}: {error}")
+
+    def clipCached(self, dropbox_path, local_path):
+        # A freshly cached clip is the chance to make its contact sheet, and the thumbnail Dropbox couldn't
+        entry = self.index.entry(dropbox_path)
+        if entry is None:
+            return
+        self.sheets.request(dropbox_path, entry["content_hash"], local_path)
+        if dropbox_path in self.thumbnails_unavailable:
+            self.generateThumbnail(dropbox_path, entry["rev"], local_path)
+
+    def onContactSheet(self, dropbox_path, sheet_path):
+        self.fileView.setThumbnail(dropbox_path, sheet_path)
+        if dropbox_path == self.scrub_path:
+            self.showScrubFrames(dropbox_path)
+
+    def showScrubFrames(self, dropbox_path):
+        self.scrub_path = dropbox_path
+        entry = self.index.entry(dropbox_path) if dropbox_path else None
+        frames = self.sheets.frames(entry["content_hash"]) if entry else None
+        if frames:
+            self.playview.setScrubFrames(*frames)
+        else:
+            self.playview.setScrubFrames()
 
     @pyqtSlot(str, str, str)
+    def onPrefetched(self, dropbox_path, local_path, error):
+        if local_path:
+            self.clipCached(dropbox_path, local_path)
+            if dropbox_path in self.review_paths:
+                self.review_ready[dropbox_path] = local_path
+                self.preloadNextReviewClip()
+        elif error:
+            print(f"Prefetch of {dropbox_path} failed: {error}")
+
     def onDownloaded(self, dropbox_path, local_path, error):
         # self.statusBar().clearMessage()
+        if dropbox_path == self.awaiting_download:
+            self.awaiting_download = None
+            self.prefetcher.setPaused(False)
+        self.prefetchAround(dropbox_path)
         if error:
             QMessageBox.critical(self, "Download error", error)
             return
+        self.clipCached(dropbox_path, local_path)
+        print(f"Clip cache stats: {self.cache.stats()}")
+        self.playUrl(QUrl.fromLocalFile(local_path))
+
+    def playUrl(self, url):
         # Play video
-        url = QUrl.fromLocalFile(local_path)
         self.player.setMedia(QMediaContent(url))
+        self.showScrubFrames(self.playing_path)
         self.playview.playButton.setFocus()
         # self.owning_widget.fullscreen_layout.addWidget(self.owning_widget.view)
 
@@ -608,6 +2705,763 @@ class SecurityVideoWindow(QWidget):
         self.owning_widget.mode = Mode.SECURITY_VIDEO
         self.stack.setCurrentIndex(2)
 
+# ---------- Camera rendering ----------
+class CameraConfig:
+    """One line of urls.txt: "name,url key=value ...".
+
+    url is the camera's main stream. grid=url and fullscreen=url replace it for the grid
+    tile and fullscreen respectively; otherwise the tile uses the cheapest of any
+    stream=WIDTHxHEIGHT@url (a substream or snapshot endpoint, can be repeated) that is
+    at least the tile's size, or the main stream if none is.
+    """
+    __slots__ = ("index", "name", "url", "priority", "refresh_ms", "options", "streams")
+
+    def __init__(self, index, name, url, options=None, streams=()):
+        self.index = index  # Position in urls.txt, also the number key that shows it fullscreen
+        self.name = name
+        self.url = url
+        self.options = options or {}
+        self.streams = sorted(streams)  # (width, height, url), smallest first
+        try:
+            self.priority = int(self.options.get("priority", ""))  # Lower loads first
+        except ValueError:
+            self.priority = None  # After every camera with a priority, in file order
+        try:
+            self.refresh_ms = int(self.options.get("refresh", SNAPSHOT_INTERVAL_MS))  # Snapshot and MJPEG tiles
+        except ValueError:
+            self.refresh_ms = SNAPSHOT_INTERVAL_MS
+
+    @classmethod
+    def parse(cls, index, line):
+        name, rest = line.split(",", 1)
+        if not rest.split():
+            raise ValueError("no URL")
+        url, *pairs = rest.split()
+        options = {}
+        streams = []
+        for pair in pairs:
+            key, _, value = pair.partition("=")
+            if key == "stream":
+                size, _, stream_url = value.partition("@")
+                try:
+                    width, height = (int(n) for n in size.lower().split("x"))
+                    streams.append((width, height, stream_url))
+                except ValueError:
+                    print(f"Ignoring stream {value} for {name}")
+            elif value:
+                options[key] = value
+        return cls(index, name.strip(), url, options, streams)
+
+    def load_order(self):
+        return (self.priority is None, self.priority or 0, self.index)
+
+    @property
+    def fullscreen_url(self):
+        return self.options.get("fullscreen", self.url)
+
+    def grid_url(self, width, height):
+        """URL for a grid tile of width x height device pixels."""
+        if "grid" in self.options:
+            return self.options["grid"]
+        for stream_width, stream_height, url in self.streams:
+            if stream_width >= width and stream_height >= height:
+                return url
+        return self.url
+
+
+def grid_rows(count, layout=GRID_LAYOUT):
+    """Cameras per row for count cameras: layout's rows in turn, then rows as wide as its last."""
+    rows = []
+    for width in layout:
+        if count <= 0:
+            break
+        rows.append(min(width, count))
+        count -= width
+    width = max(1, layout[-1] if layout else count)
+    while count > 0:
+        rows.append(min(width, count))
+        count -= width
+    return rows
+
+
+def configure_chromium():
+    """Apply the renderer process model; Chromium reads these flags once, so call before the QApplication."""
+    flags = os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS", "").split()
+    if RENDERER_PROCESS_MODEL in ("process-per-site", "single-process"):
+        flags.append(f"--{RENDERER_PROCESS_MODEL}")
+    if RENDERER_PROCESS_LIMIT:
+        flags.append(f"--renderer-process-limit={RENDERER_PROCESS_LIMIT}")
+    os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = " ".join(flags)
+
+
+def process_rss(pid):
+    """Resident set size of a process in bytes from /proc, or 0 if it has gone."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+class CameraProfile(QObject):
+    """One QWebEngineProfile for every camera view, and a watch on what their renderers cost.
+
+    Views share the profile's disk HTTP cache. Every RENDERER_MEMORY_CHECK_MS the renderer
+    processes behind the views are measured (several views may share one, depending on the
+    process model) and, over RENDERER_MEMORY_BUDGET_BYTES, the biggest one is relieved: hidden
+    views are discarded, visible ones reloaded. Renderers that crash or are OOM-killed are
+    reloaded too.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.profile = QWebEngineProfile("cameras", self)
+        self.profile.setCachePath(os.path.abspath(os.path.join(CAMERA_PROFILE_DIR, "cache")))
+        self.profile.setPersistentStoragePath(os.path.abspath(os.path.join(CAMERA_PROFILE_DIR, "storage")))
+        self.profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+        self.profile.setHttpCacheMaximumSize(CAMERA_HTTP_CACHE_MAX_BYTES)
+        self.views = {}  # id(view) -> (name, view)
+        self.relieved = {}  # id(view) -> time.monotonic() of the last reload/discard for memory
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.checkMemory)
+        self.timer.start(RENDERER_MEMORY_CHECK_MS)
+
+    def createView(self, name, parent=None):
+        view = QWebEngineView(parent)
+        page = QWebEnginePage(self.profile, view)
+        view.setPage(page)
+        key = id(view)
+        self.views[key] = (name, view)
+        view.destroyed.connect(lambda _=None, key=key: self.forget(key))
+        page.renderProcessTerminated.connect(
+            lambda status, code, key=key: self.onRendererTerminated(key, status, code))
+        return view
+
+    def forget(self, key):
+        self.views.pop(key, None)
+        self.relieved.pop(key, None)
+
+    def onRendererTerminated(self, key, status, code):
+        if status == QWebEnginePage.NormalTerminationStatus or key not in self.views:
+            return
+        name, view = self.views[key]
+        print(f"Renderer for {name} ended ({status}, exit {code}), reloading")
+        QTimer.singleShot(2000, lambda: key in self.views and view.reload())
+
+    def rendererUsage(self):
+        """{pid: (rss bytes, [(name, view), ...])} for the renderer behind each view."""
+        usage = {}
+        for name, view in list(self.views.values()):
+            pid = view.page().renderProcessPid() if hasattr(view.page(), "renderProcessPid") else 0
+            if pid <= 0:
+                continue
+            if pid not in usage:
+                usage[pid] = (process_rss(pid), [])
+            usage[pid][1].append((name, view))
+        return usage
+
+    def checkMemory(self):
+        usage = self.rendererUsage()
+        if not usage:
+            return
+        total = sum(rss for rss, _ in usage.values())
+        if total <= RENDERER_MEMORY_BUDGET_BYTES:
+            return  # Quiet while within budget; this runs every minute for as long as the app does
+        mb = 1024 * 1024
+        print(f"Renderer memory {total // mb}MB of {RENDERER_MEMORY_BUDGET_BYTES // mb}MB: " + ", ".join(
+            f"{'+'.join(name for name, _ in views)} {rss // mb}MB (pid {pid})" for pid, (rss, views) in usage.items()))
+        self.relieve(max(usage.values(), key=lambda u: u[0])[1])
+
+    def relieve(self, views):
+        now = time.monotonic()
+        for name, view in views:
+            key = id(view)
+            if now - self.relieved.get(key, 0) < RENDERER_RELIEF_INTERVAL:
+                continue
+            self.relieved[key] = now
+            page = view.page()
+            if not view.isVisible() and hasattr(page, "setLifecycleState"):
+                print(f"Memory over budget, discarding hidden camera view {name}")
+                page.setLifecycleState(QWebEnginePage.LifecycleState.Discarded)
+            else:
+                print(f"Memory over budget, reloading camera view {name}")
+                view.reload()
+
+
+
+def decode_frame(data, width, height):
+    """Decode an image to fit width x height, letting the JPEG decoder downscale as it goes."""
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    buffer.open(QIODevice.ReadOnly)
+    reader = QImageReader(buffer)
+    size = reader.size()
+    if size.isValid() and width > 0 and height > 0 and (size.width() > width or size.height() > height):
+        reader.setScaledSize(size.scaled(width, height, Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"Can't decode frame: {reader.errorString()}")
+    return image
+
+
+JPEG_MARKER = re.compile(rb"\xff[\xd8\xd9]")  # Start or end of image
+CONTENT_LENGTH = re.compile(rb"content-length:[ \t]*(\d+)", re.IGNORECASE)
+
+
+def cut_mjpeg_frame(data):
+    """Split the first whole JPEG off an MJPEG stream buffer, returning (frame, rest).
+
+    Uses the Content-Length from the part's headers when they carry one. Otherwise the frame
+    runs from the first start marker to the end marker that matches it, so a thumbnail
+    embedded in the EXIF data isn't mistaken for the frame. frame is None until it's all there.
+    """
+    start = data.find(b"\xff\xd8")
+    if start < 0:
+        return None, data
+    head = data[:start]
+    length = CONTENT_LENGTH.findall(head)
+    if length and head.endswith(b"\r\n\r\n"):
+        end = start + int(length[-1])
+        return (data[start:end], data[end:]) if len(data) >= end else (None, data)
+    depth = 0
+    for marker in JPEG_MARKER.finditer(data, start):
+        depth += 1 if marker.group() == b"\xff\xd8" else -1
+        if depth == 0:
+            return data[start:marker.end()], data[marker.end():]
+    return None, data
+
+
+class SnapshotClient:
+    """The keep-alive HTTP session and worker threads shared by every SnapshotTile."""
+    shared = None
+
+    def __init__(self):
+        load_http_modules()
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pool = ThreadPoolExecutor(max_workers=SNAPSHOT_WORKERS, thread_name_prefix="snapshot")
+        QApplication.instance().aboutToQuit.connect(self.shutdown)
+
+    @classmethod
+    def get(cls):
+        if cls.shared is None:
+            cls.shared = SnapshotClient()
+        return cls.shared
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class SnapshotTile(QLabel):
+    """A camera tile painted from JPEG snapshots or an MJPEG stream, without a Chromium renderer.
+
+    Selected with renderer=snapshot or renderer=mjpeg in urls.txt. Snapshots are polled on
+    the shared SnapshotClient threads, one request in flight per tile; an MJPEG stream is
+    read on its own thread and only the latest frame is decoded when one is due. Frames are
+    decoded off the UI thread at the tile's size. The refresh interval adapts between
+    SNAPSHOT_MIN_INTERVAL_MS and SNAPSHOT_MAX_INTERVAL_MS to what frames cost and to motion.
+
+    Looks enough like a QWebEngineView (load, url_to_load, loadFinished) for the grid's
+    lifecycle, health and motion handling. Stops on the first error and reports it through
+    loadFinished(False), leaving reconnecting to CameraHealth.
+    """
+    loadFinished = pyqtSignal(bool)
+    frameReady = pyqtSignal(int, QImage, float)  # generation, frame, seconds it took - from a worker
+    failed = pyqtSignal(int, str)  # generation, error - from a worker
+
+    def __init__(self, mjpeg=False, interval=SNAPSHOT_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.setAlignment(Qt.AlignCenter)
+        self.setMinimumSize(1, 1)  # Don't let the frame's size drive the layout
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setStyleSheet("background-color: black;")
+        self.client = SnapshotClient.get()
+        self.mjpeg = mjpeg
+        self.base_interval = interval
+        self.interval = interval
+        self.boosted = False
+        self.url_to_load = QUrl()
+        self.generation = 0  # Bumped on load and pause so late results are dropped
+        self.running = False
+        self.loaded = False
+        self.failed_load = False  # Stopped by an error until CameraHealth loads it again
+        self.busy = False  # A frame is being fetched or decoded
+        self.target = (0, 0)  # Decode size, read by the workers
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.fetch)
+        self.frameReady.connect(self.onFrame)
+        self.failed.connect(self.onFailed)
+
+    def load(self, url):
+        self.url_to_load = QUrl(url)
+        self.loaded = False
+        self.failed_load = False
+        self.pause()
+        self.resume()
+
+    def pause(self):
+        self.running = False
+        self.generation += 1
+        self.timer.stop()
+
+    def resume(self):
+        if self.running or not self.url_to_load.isValid():
+            return
+        self.running = True
+        self.busy = False
+        self.generation += 1
+        if self.mjpeg:
+            threading.Thread(target=self.streamFrames, args=(self.generation, self.url_to_load.toString()),
+                             daemon=True).start()
+        else:
+            self.timer.start(0)
+
+    def setBoost(self, boosted):
+        self.boosted = boosted
+        if boosted and not self.mjpeg and self.timer.isActive():
+            self.timer.start(min(self.timer.remainingTime(), SNAPSHOT_MIN_INTERVAL_MS))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        scale = self.devicePixelRatioF()
+        self.target = (int(self.width() * scale), int(self.height() * scale))
+
+    def fetch(self):
+        if not self.running or self.busy:
+            return
+        self.busy = True
+        self.client.pool.submit(self.fetchFrame, self.generation, self.url_to_load.toString())
+
+    def fetchFrame(self, generation, url):
+        # On a SnapshotClient thread
+        start = time.monotonic()
+        try:
+            response = self.client.session.get(url, timeout=SNAPSHOT_TIMEOUT)
+            response.raise_for_status()
+            image = decode_frame(response.content, *self.target)
+        except Exception as e:
+            self.failed.emit(generation, str(e))
+            return
+        self.frameReady.emit(generation, image, time.monotonic() - start)
+
+    def streamFrames(self, generation, url):
+        # On the tile's own thread. Frames are cut out by cut_mjpeg_frame; ones that arrive
+        # before the next is due are skipped undecoded
+        due = 0
+        data = b""
+        try:
+            with self.client.session.get(url, stream=True, timeout=SNAPSHOT_TIMEOUT) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(64 * 1024):
+                    if generation != self.generation:
+                        return
+                    data += chunk
+                    frame = None
+                    while True:
+                        latest, data = cut_mjpeg_frame(data)
+                        if latest is None:
+                            break
+                        frame = latest
+                    if frame is None:
+                        if len(data) > 8 * 1024 * 1024:
+                            raise ValueError("No JPEG frames in stream")
+                        continue
+                    now = time.monotonic()
+                    if now < due or self.busy:
+                        continue
+                    self.busy = True
+                    image = decode_frame(frame, *self.target)
+                    self.frameReady.emit(generation, image, time.monotonic() - now)
+                    due = now + self.interval / 1000
+            raise ValueError("Stream ended")
+        except Exception as e:
+            self.failed.emit(generation, str(e))
+
+    @pyqtSlot(int, QImage, float)
+    def onFrame(self, generation, image, cost):
+        if generation != self.generation:
+            return
+        self.busy = False
+        self.setPixmap(QPixmap.fromImage(image))
+        if not self.loaded:
+            self.loaded = True
+            self.loadFinished.emit(True)
+        interval = self.base_interval / 2 if self.boosted else self.base_interval
+        interval = max(interval, cost * 1000 * SNAPSHOT_LOAD_FACTOR)
+        self.interval = int(min(SNAPSHOT_MAX_INTERVAL_MS, max(SNAPSHOT_MIN_INTERVAL_MS, interval)))
+        if not self.mjpeg and self.running:
+            self.timer.start(self.interval)
+
+    @pyqtSlot(int, str)
+    def onFailed(self, generation, error):
+        if generation != self.generation:
+            return
+        print(f"{self.url_to_load.toString()}: {error}")
+        self.pause()
+        self.loaded = False
+        self.failed_load = True
+        self.loadFinished.emit(False)
+
+
+class GridLifecycle(QObject):
+    """Stops the grid's camera views decoding while the grid is off screen, and brings them back.
+
+    Hidden tiles are frozen straight away (page lifecycle, Qt 5.14+), keeping their last
+    frame, and unloaded after GRID_DISCARD_AFTER_MS so their streams and renderer memory
+    go too. On resume frozen tiles carry on at once; unloaded ones reconnect one at a time,
+    in priority order, showing the snapshot taken when they were frozen until they load.
+    Without lifecycle support tiles are simply unloaded and reloaded.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.views = []  # In resume priority order
+        self.suspended = False
+        self.keep = None  # View left running while suspended
+        self.lifecycle = hasattr(QWebEnginePage, "setLifecycleState")
+        self.discard_timer = QTimer(self)
+        self.discard_timer.setSingleShot(True)
+        self.discard_timer.timeout.connect(self.discard)
+
+    def addView(self, view):
+        view.snapshot = None  # QLabel over the tile while it reconnects
+        view.unloaded = False  # Only used without page lifecycle support
+        view.loadFinished.connect(lambda ok, view=view: self.onLoaded(view))
+        self.views.append(view)
+
+    def state(self, view):
+        return view.page().lifecycleState() if self.lifecycle else None
+
+    def suspend(self, keep=None):
+        """Freeze every tile view except keep (shown fullscreen)."""
+        if self.suspended:
+            return
+        self.suspended = True
+        self.keep = keep
+        for view in self.views:
+            if view is keep:
+                continue
+            if isinstance(view, SnapshotTile):
+                view.pause()  # Keeps showing its last frame
+                continue
+            view.last_frame = view.grab()
+            if self.lifecycle:
+                view.page().setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+            else:
+                view.unloaded = True
+                view.page().setUrl(QUrl("about:blank"))
+        self.discard_timer.start(GRID_DISCARD_AFTER_MS)
+
+    def isSuspended(self, view):
+        return self.suspended and view is not self.keep
+
+    def discard(self):
+        for view in self.views:
+            if isinstance(view, SnapshotTile):
+                continue
+            if self.lifecycle and self.state(view) == QWebEnginePage.LifecycleState.Frozen:
+                view.page().setLifecycleState(QWebEnginePage.LifecycleState.Discarded)
+
+    def activate(self, view):
+        if isinstance(view, SnapshotTile):
+            if not view.failed_load:  # Failed ones wait for CameraHealth's backoff
+                view.resume()
+        elif self.lifecycle:
+            if self.state(view) != QWebEnginePage.LifecycleState.Active:
+                view.page().setLifecycleState(QWebEnginePage.LifecycleState.Active)
+        elif view.unloaded:
+            view.unloaded = False
+            view.load(view.url_to_load)
+
+    def resume(self):
+        if not self.suspended:
+            return
+        self.suspended = False
+        self.discard_timer.stop()
+        delay = 0
+        for view in self.views:
+            if isinstance(view, SnapshotTile) or (
+                    self.lifecycle and self.state(view) != QWebEnginePage.LifecycleState.Discarded):
+                self.activate(view)
+                continue
+            if not self.lifecycle and not view.unloaded:
+                continue
+            # Has to reconnect; show where it left off meanwhile and don't start every stream at once
+            self.showSnapshot(view)
+            QTimer.singleShot(delay, lambda view=view: not self.suspended and self.activate(view))
+            delay += GRID_RESUME_STAGGER_MS
+
+    def showSnapshot(self, view):
+        frame = getattr(view, "last_frame", None)
+        if frame is None or frame.isNull() or view.parentWidget() is None:
+            return
+        if view.snapshot is None:
+            view.snapshot = QLabel(view.parentWidget())
+            view.snapshot.setScaledContents(True)
+        view.snapshot.setPixmap(frame)
+        view.snapshot.setGeometry(view.geometry())
+        view.snapshot.show()
+        view.snapshot.raise_()
+
+    def onLoaded(self, view):
+        if view.snapshot is not None:
+            view.snapshot.hide()
+
+
+
+class TileSampler(QObject):
+    """Grabs the visible grid tiles in turn, shrunk to TILE_SAMPLE_SIZE greyscale bytes.
+
+    One tile is grabbed per tick so the cost is spread across TILE_SAMPLE_MS rather than
+    landing at once. Views that are hidden or suspended are skipped.
+    """
+    sampled = pyqtSignal(object, bytes, float)  # view, row-major grey bytes, time.monotonic()
+
+    def __init__(self, lifecycle, interval=TILE_SAMPLE_MS, parent=None):
+        super().__init__(parent)
+        self.lifecycle = lifecycle
+        self.interval = interval
+        self.views = []
+        self.next_view = 0
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.sampleNext)
+
+    def addView(self, view):
+        self.views.append(view)
+        self.timer.start(max(100, self.interval // len(self.views)))
+
+    def sampleNext(self):
+        if not self.views:
+            return
+        view = self.views[self.next_view % len(self.views)]
+        self.next_view += 1
+        if not view.isVisible() or self.lifecycle.isSuspended(view) or view.width() == 0:
+            return
+        width, height = TILE_SAMPLE_SIZE
+        image = view.grab().toImage().scaled(width, height, Qt.IgnoreAspectRatio, Qt.FastTransformation)
+        image = image.convertToFormat(QImage.Format_Grayscale8)
+        data = image.constBits().asstring(image.byteCount())
+        if image.bytesPerLine() != width:
+            line = image.bytesPerLine()
+            data = b"".join(data[y * line:y * line + width] for y in range(height))
+        self.sampled.emit(view, data, time.monotonic())
+
+
+class CameraStatus:
+    __slots__ = ("name", "state", "failures", "down_since", "recovery_s", "frame", "sampled_at",
+                 "changed_at", "dark_since", "loaded_at", "live", "retry")
+
+    def __init__(self, name):
+        self.name = name
+        self.state = "loading"  # loading, ok, failed, frozen, black, reconnecting or checking (loaded, no picture yet)
+        self.failures = 0  # Consecutive, sets the backoff
+        self.down_since = None  # time.monotonic() the current outage was noticed
+        self.recovery_s = None  # How long the last outage lasted
+        self.frame = None  # Last sample
+        self.sampled_at = 0
+        self.changed_at = 0
+        self.dark_since = None
+        self.loaded_at = 0  # time.monotonic() of the last successful load
+        self.live = False  # Samples have changed since loading, so grabs are meaningful
+        self.retry = None  # Pending reconnect QTimer
+
+    def asdict(self):
+        return {"name": self.name, "state": self.state, "failures": self.failures,
+                "down_for_s": round(time.monotonic() - self.down_since, 1) if self.down_since else 0,
+                "last_recovery_s": round(self.recovery_s, 1) if self.recovery_s is not None else None}
+
+
+def frame_level(a):
+    return float(np.frombuffer(a, np.uint8).mean()) if np is not None else sum(a) / len(a)
+
+
+class CameraHealth(QObject):
+    """Watches each grid tile and reconnects the ones that fail, freeze or go black.
+
+    Page load failures come from handle_load_finished; frozen and black feeds from the
+    TileSampler. Reconnects back off exponentially with jitter per camera. A feed only
+    counts as frozen or black once its samples have been seen changing (so a platform
+    where grabs of the web view don't work never triggers reloads); after such a reload
+    it has to show a changing picture again within the same time or it faults again.
+    Health is printed on change and written to HEALTH_STATUS_FILE.
+    """
+    changed = pyqtSignal(str, str)  # camera name, state
+
+    def __init__(self, sampler, lifecycle, parent=None):
+        super().__init__(parent)
+        self.lifecycle = lifecycle
+        self.cameras = {}  # id(view) -> (view, CameraStatus)
+        sampler.sampled.connect(self.onSampled)
+
+    def addView(self, view, name):
+        self.cameras[id(view)] = (view, CameraStatus(name))
+
+    def status(self):
+        return [status.asdict() for _, status in self.cameras.values()]
+
+    def setState(self, status, state):
+        if status.state == state:
+            return
+        status.state = state
+        print(f"Camera {status.name}: {state}")
+        self.changed.emit(status.name, state)
+        try:
+            with open(HEALTH_STATUS_FILE + ".tmp", "w") as f:
+                json.dump({"updated": time.time(), "cameras": self.status()}, f)
+            os.replace(HEALTH_STATUS_FILE + ".tmp", HEALTH_STATUS_FILE)
+        except OSError as e:
+            print(f"Can't write {HEALTH_STATUS_FILE}: {e}")
+
+    def recovered(self, status):
+        if status.down_since is not None:
+            status.recovery_s = time.monotonic() - status.down_since
+            print(f"Camera {status.name} recovered after {status.recovery_s:.1f}s")
+        status.down_since = None
+        status.failures = 0
+        self.setState(status, "ok")
+
+    def onLoadFinished(self, view, success):
+        view, status = self.cameras.get(id(view), (view, None))
+        if status is None:
+            return
+        status.frame = None
+        status.live = False
+        status.dark_since = None
+        status.loaded_at = time.monotonic()
+        if success:
+            if status.down_since is None or status.state == "failed":
+                self.recovered(status)
+            else:
+                self.setState(status, "checking")  # Frozen and black feeds have to show a picture first
+        else:
+            self.fault(view, status, "failed")
+
+    def onSampled(self, view, data, now):
+        view, status = self.cameras.get(id(view), (view, None))
+        if status is None or status.state not in ("ok", "checking"):
+            return
+        if status.frame is None or now - status.sampled_at > 3 * TILE_SAMPLE_MS / 1000:
+            # First sample since loading or since the grid was hidden
+            status.frame, status.sampled_at, status.changed_at = data, now, now
+            return
+        dark = frame_level(data) < HEALTH_BLACK_LEVEL
+        if data != status.frame:
+            status.changed_at = now
+            if not dark:
+                status.live = True
+        status.frame, status.sampled_at = data, now
+        status.dark_since = (status.dark_since or now) if dark else None
+        if not status.live:
+            if status.state == "checking":
+                # Reloaded after freezing or going black, when grabs were known to work, and still no
+                # picture: fault again so the backoff carries on rather than waiting here for good
+                if status.dark_since is not None and now - status.dark_since >= HEALTH_BLACK_AFTER:
+                    self.fault(view, status, "black")
+                elif now - status.loaded_at >= HEALTH_FROZEN_AFTER:
+                    self.fault(view, status, "frozen")
+            return
+        if status.dark_since is not None and now - status.dark_since >= HEALTH_BLACK_AFTER:
+            self.fault(view, status, "black")
+        elif now - status.changed_at >= HEALTH_FROZEN_AFTER:
+            self.fault(view, status, "frozen")
+        elif status.down_since is not None and status.changed_at == now and not dark:
+            self.recovered(status)
+
+    def backoff(self, failures):
+        delay = min(HEALTH_BACKOFF_MAX, HEALTH_BACKOFF_BASE * 2 ** (failures - 1))
+        return random.uniform(delay / 2, delay)  # Cameras that fail together don't retry together
+
+    def fault(self, view, status, state):
+        status.failures += 1
+        if status.down_since is None:
+            status.down_since = time.monotonic()
+        self.setState(status, state)
+        if status.failures > view.max_retries:
+            print(f"Failed to load {view.url_to_load.toString()} after {view.max_retries} attempts")
+            return
+        delay = self.backoff(status.failures)
+        print(f"Reconnecting {status.name} in {delay:.0f}s (attempt {status.failures})")
+        if status.retry is None:
+            status.retry = QTimer(self)
+            status.retry.setSingleShot(True)
+            status.retry.timeout.connect(lambda view=view, status=status: self.reconnect(view, status))
+        status.retry.start(int(delay * 1000))
+
+    def reconnect(self, view, status):
+        if self.lifecycle.isSuspended(view):
+            status.retry.start(int(self.backoff(status.failures) * 1000))  # Try again once it's shown
+            return
+        if status.state != "failed":
+            self.setState(status, "reconnecting")  # A failed load recovers once it loads, the others once they show a picture
+        view.load(view.url_to_load)
+
+
+
+def motion_fraction(previous, current):
+    """Fraction of sample pixels that changed by at least MOTION_PIXEL_CHANGE grey levels."""
+    if np is not None:
+        diff = np.abs(np.frombuffer(current, np.uint8).astype(np.int16) - np.frombuffer(previous, np.uint8))
+        return float(np.count_nonzero(diff >= MOTION_PIXEL_CHANGE)) / diff.size
+    return sum(abs(x - y) >= MOTION_PIXEL_CHANGE for x, y in zip(previous, current)) / len(current)
+
+
+class MotionDetector(QObject):
+    """Flags grid tiles with activity by differencing consecutive TileSampler samples.
+
+    The differencing runs on a single worker thread; with 32x18 samples every couple of
+    seconds it costs next to nothing beside the streams. motion is emitted on the UI thread
+    when a tile becomes active and again MOTION_HOLD_MS after its last movement.
+    """
+    motion = pyqtSignal(object, bool)  # view, active
+    scored = pyqtSignal(object, float, float)  # view, moving fraction, sample time - from the worker
+
+    def __init__(self, sampler, parent=None):
+        super().__init__(parent)
+        self.previous = {}  # id(view) -> (sample, time)
+        self.active = {}  # id(view) -> QTimer ending the highlight
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        self.scored.connect(self.onScored)
+        sampler.sampled.connect(self.onSampled)
+
+    def onSampled(self, view, data, now):
+        previous, then = self.previous.get(id(view), (None, 0))
+        self.previous[id(view)] = (data, now)
+        if previous is None or now - then > 3 * TILE_SAMPLE_MS / 1000:
+            return  # Nothing recent to compare with, e.g. the grid was hidden
+        future = self.pool.submit(motion_fraction, previous, data)
+        future.add_done_callback(lambda f, view=view: self.finished(view, now, f))
+
+    def finished(self, view, now, future):
+        # Called on the worker thread, so hand over to the UI thread through a signal
+        if not future.cancelled() and future.exception() is None:
+            self.scored.emit(view, future.result(), now)
+
+    @pyqtSlot(object, float, float)
+    def onScored(self, view, fraction, now):
+        if fraction < MOTION_THRESHOLD or fraction > MOTION_GLOBAL_CHANGE:
+            return
+        timer = self.active.get(id(view))
+        if timer is None:
+            timer = self.active[id(view)] = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda view=view: self.onQuiet(view))
+            self.motion.emit(view, True)
+        timer.start(MOTION_HOLD_MS)
+
+    def onQuiet(self, view):
+        self.active.pop(id(view)).deleteLater()
+        self.motion.emit(view, False)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
 class WebGrid(QWidget):
     def __init__(self):
         super().__init__()
@@ -633,38 +3487,96 @@ class WebGrid(QWidget):
 
         self.security_video_widget = QWidget()
         self.security_video_layout = QVBoxLayout(self.security_video_widget)
-        self.security_video_window = SecurityVideoWindow(self, self.security_video_layout)
+        self.security_video_window = None  # Built on first use, see securityVideoWindow()
         self.stack.addWidget(self.security_video_widget)
 
-        # Video view and player
-        self.player = QMediaPlayer(self, QMediaPlayer.VideoSurface)
-        self.playerview = VideoPlayerWidget(self.player)
-
-        # Debug signals
-        self.player.mediaStatusChanged.connect(lambda s: print("Media status:", s))
-        self.player.stateChanged.connect(lambda s: print("Player state:", s))
-        self.player.error.connect(lambda e: print("Error:", self.player.errorString()))
-
+        # Video view and player for photos and the webcam, built on first use, see photoPlayer()
+        self.player = None
+        self.playerview = None
+        self.first_paint = False
+        self.first_camera = False
+        self.camera_profile = CameraProfile(self)
+        self.camera_views = {}  # url -> grid tile view, borrowed by show_fullscreen
+        self.fullscreen_view = None  # Grid tile view currently shown fullscreen
+        self.grid_lifecycle = GridLifecycle(self)
+        self.tile_sampler = TileSampler(self.grid_lifecycle, parent=self)
+        self.camera_health = CameraHealth(self.tile_sampler, self.grid_lifecycle, self)
+        self.motion_detector = MotionDetector(self.tile_sampler, self)
+        self.motion_detector.motion.connect(self.onMotion)
+        QApplication.instance().aboutToQuit.connect(self.motion_detector.shutdown)
+        self.motion_promoted = None  # Tile view shown fullscreen by MOTION_AUTO_FULLSCREEN
 
         self.init_grid()
         self.stack.setCurrentWidget(self.grid_widget)
+        self.stack.currentChanged.connect(self.onStackChanged)
         self.showFullScreen()
+        STARTUP.mark("grid built")
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_paint:
+            self.first_paint = True
+            STARTUP.mark("first paint")
+            # Now the cameras are up, get the imports the other views need out of the way
+            QTimer.singleShot(0, self.warmUp)
+
+    def warmUp(self):
+        load_video_modules()
+        threading.Thread(target=load_dropbox_modules, name="warm-up", daemon=True).start()
+
+    def photoPlayer(self):
+        if self.player is None:
+            load_video_modules()
+            self.player = QMediaPlayer(self, QMediaPlayer.VideoSurface)
+            self.playerview = VideoPlayerWidget(self.player)
+
+            # Debug signals
+            self.player.mediaStatusChanged.connect(lambda s: print("Media status:", s))
+            self.player.stateChanged.connect(lambda s: print("Player state:", s))
+            self.player.error.connect(lambda e: print("Error:", self.player.errorString()))
+        return self.player
+
+    def securityVideoWindow(self):
+        if self.security_video_window is None:
+            start = time.monotonic()
+            load_video_modules()
+            load_dropbox_modules()
+            self.security_video_window = SecurityVideoWindow(self, self.security_video_layout)
+            print(f"Security video viewer built in {time.monotonic() - start:.2f}s")
+        return self.security_video_window
 
     # List of URLs to display
     def load_urls(self, filepath):
-        self.urls = []  
-        self.urlnames = []
+        # One camera per line, "name,url" optionally followed by key=value options, e.g.
+        # "Drive,http://cam1/ priority=1". "layout=2,4" sets the cameras per grid row, # starts a comment
+        self.cameras = []
+        self.grid_layout = GRID_LAYOUT
 
         try:
             with open(filepath, "r") as f:
                 for line in f:
-                    parts = line.strip().split(",", 1)  # Split into 2 parts: name and URL
-                    if len(parts) == 2:
-                        name, url = parts
-                        self.urls.append(url.strip())
-                        self.urlnames.append(name)
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    if line.startswith("layout="):
+                        try:
+                            widths = tuple(int(n) for n in line[len("layout="):].split(","))
+                            if min(widths) < 1:
+                                raise ValueError("rows need at least one camera")
+                            self.grid_layout = widths
+                        except ValueError as e:
+                            print(f"Ignoring {line}: {e}")
+                        continue
+                    if "," in line:
+                        try:
+                            self.cameras.append(CameraConfig.parse(len(self.cameras), line))
+                        except ValueError as e:
+                            print(f"Ignoring {line}: {e}")  # Just this camera, not the rest of the file
         except Exception as e:
             print(f"Error loading URLs: {e}")
+        self.urls = [camera.url for camera in self.cameras]
+        self.urlnames = [camera.name for camera in self.cameras]
+        self.camera_by_url = {camera.url: camera for camera in self.cameras}
 
         # self.name = ""
         # self.password = ""
@@ -693,10 +3605,29 @@ class WebGrid(QWidget):
                 # Go back to grid view
                 self.showCameras()
                 return
-            elif self.mode == Mode.SECURITY_VIDEO or self.mode == Mode.SECURITY_CAMERA_FOLDER:
+            elif self.mode in (Mode.SECURITY_VIDEO, Mode.SECURITY_CAMERA_FOLDER, Mode.DAY_REVIEW):
                 self.security_video_window.onBack()
                 return
 
+        if self.mode == Mode.DAY_REVIEW:
+            # Left/right step through the day's clips, up/down change speed
+            if key == Qt.Key_Pause:
+                self.security_video_window.playview.togglePlay()
+            elif key in (Qt.Key_Right, Qt.Key_L):
+                self.security_video_window.reviewStep(1)
+            elif key in (Qt.Key_Left, Qt.Key_H):
+                self.security_video_window.reviewStep(-1)
+            elif key in (Qt.Key_Up, Qt.Key_K):
+                self.security_video_window.reviewSpeed(1)
+            elif key in (Qt.Key_Down, Qt.Key_J):
+                self.security_video_window.reviewSpeed(-1)
+            elif key in (Qt.Key_Enter, Qt.Key_Return) and isinstance(QApplication.focusWidget(), QPushButton):
+                QApplication.focusWidget().click()
+            return
+        if self.mode == Mode.SECURITY_CAMERA_FOLDER and key in (Qt.Key_R, Qt.Key_MediaPlay):
+            self.security_video_window.startDayReview()
+            return
+
         if self.mode in (Mode.PLAY, Mode.SLIDESHOW, Mode.SECURITY_VIDEO):
             if key == Qt.Key_Pause:
                 self.toggle_play_pause()
@@ -704,16 +3635,8 @@ class WebGrid(QWidget):
         focus_widget = QApplication.focusWidget()
         
         if self.mode == Mode.CAMERA:
-            if key == Qt.Key_1:
-                self.show_fullscreen(self.urls[0])
-            elif key == Qt.Key_2:
-                self.show_fullscreen(self.urls[1])
-            elif key == Qt.Key_3:
-                self.show_fullscreen(self.urls[2])
-            elif key == Qt.Key_4:
-                self.show_fullscreen(self.urls[3])
-            elif key == Qt.Key_5:
-                self.show_fullscreen(self.urls[4])
+            if Qt.Key_1 <= key <= Qt.Key_9 and key - Qt.Key_1 < len(self.urls):
+                self.show_fullscreen(self.urls[key - Qt.Key_1])
 
         # print(f"Key pressed: {key}, Focus widget: {type(focus_widget)}, Mode: {self.mode}")
         if key in (Qt.Key_Right, Qt.Key_Down, Qt.Key_L, Qt.Key_J):
@@ -819,84 +3742,120 @@ class WebGrid(QWidget):
 
         outer_layout.addWidget(top_row)
 
-        # Layout is two parts, first is the first two cameras on top of the following four cameras
+        # Rows of cameras as set by the layout, each row sharing the height equally
         main_layout = QVBoxLayout()
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.setSpacing(2)
 
-        top_layout = QVBoxLayout()
-        top_layout.setContentsMargins(0, 0, 0, 0)
-
-        top_widget = QWidget()
-        top_grid = QGridLayout(top_widget)
-        top_grid.setContentsMargins(0, 0, 0, 0)
-        top_grid.setSpacing(2)
+        self.pending_tiles = []  # (camera, tile layout, placeholder) waiting for their view
+        self.tile_timer = QTimer(self)
+        self.tile_timer.setSingleShot(True)
+        self.tile_timer.timeout.connect(self.createNextTileView)
+        cameras = iter(self.cameras)
+        rows = grid_rows(len(self.cameras), self.grid_layout)
+        for width in rows:
+            row_widget = QWidget()
+            row_grid = QGridLayout(row_widget)
+            row_grid.setContentsMargins(0, 0, 0, 0)
+            row_grid.setSpacing(2)
+            for column, camera in zip(range(width), cameras):
+                row_grid.addWidget(self.cameraTile(camera, width, len(rows)), 0, column)
+            main_layout.addWidget(row_widget)
+
+        # Views are made one at a time so more cameras don't mean a longer, busier start
+        self.pending_tiles.sort(key=lambda tile: tile[0].load_order())
+        self.tile_timer.start(0)
 
-        bottom_layout = QVBoxLayout()
-        bottom_layout.setContentsMargins(0, 0, 0, 0)
-        # bottom_layout.setSpacing(2)
-
-        bottom_widget = QWidget()
-        bottom_grid = QGridLayout(bottom_widget)
-        bottom_grid.setContentsMargins(0, 0, 0, 0)
-        bottom_grid.setSpacing(2)
-
-        for i in range(0, 6):
-            container = QWidget()
-            container.setCursor(Qt.BlankCursor)
-            layout = QVBoxLayout(container)
-            layout.setContentsMargins(0, 0, 0, 0)
-
-            browser = QWebEngineView()
-            browser.setCursor(Qt.BlankCursor)
-            browser.retry_count = 0
-            browser.max_retries = 1000
-            browser.url_to_load = QUrl(self.urls[i])
-            browser.load(browser.url_to_load)
-            browser.loadFinished.connect(lambda success, b=browser: self.handle_load_finished(b, success))        
-            browser.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-
-            button = QPushButton(f"{i+1} {self.urlnames[i]}")
-            button.setStyleSheet("""
-                QPushButton {
-                    color: white;
-                    font-size: 28px;
-                    padding: 8px;
-                }
-                QPushButton:focus {
-                    border: 2px solid #00ffff;
-                    background-color: #222;
-                }
-            """)
-            button.setCursor(Qt.PointingHandCursor)
-            button.setFocusPolicy(Qt.StrongFocus)
-            button.setMinimumHeight(40)
-            button.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
-            button.clicked.connect(lambda event, u=self.urls[i]: self.show_fullscreen(u))
-
-            layout.addWidget(browser)
-            layout.addWidget(button)
-
-            if i < 2:
-                top_grid.addWidget(container, 0, i)
-            else:         
-                bottom_grid.addWidget(container, 0, i)
-
-        # top_layout.addWidget(top_widget)
-        # bottom_layout.addWidget(bottom_widget)
-        main_layout.addWidget(top_widget)
-        main_layout.addWidget(bottom_widget)
-        
         outer_layout.addLayout(main_layout)
         self.grid_widget.setLayout(outer_layout)     
         self.viewer_btn.setFocus()   
     
+    def cameraTile(self, camera, columns, rows):
+        """The tile's name button and a placeholder where its view goes once createNextTileView gets to it."""
+        container = QWidget()
+        container.setCursor(Qt.BlankCursor)
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        placeholder = QWidget()
+        placeholder.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+        button = QPushButton(f"{camera.index + 1} {camera.name}")
+        button.setStyleSheet("""
+            QPushButton {
+                color: white;
+                font-size: 28px;
+                padding: 8px;
+            }
+            QPushButton:focus {
+                border: 2px solid #00ffff;
+                background-color: #222;
+            }
+            QPushButton[motion="true"] {
+                background-color: #802000;
+            }
+        """)
+        button.setCursor(Qt.PointingHandCursor)
+        button.setFocusPolicy(Qt.StrongFocus)
+        button.setMinimumHeight(40)
+        button.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
+        button.clicked.connect(lambda event, u=camera.url: self.show_fullscreen(u))
+
+        layout.addWidget(placeholder)
+        layout.addWidget(button)
+        placeholder.tile_button = button
+        placeholder.grid_share = (columns, rows)  # For a size estimate before the grid is laid out
+        self.pending_tiles.append((camera, layout, placeholder))
+        return container
+
+    def createNextTileView(self):
+        if not self.pending_tiles or self.grid_lifecycle.suspended:
+            return  # Carried on by onStackChanged when the grid is back
+        camera, layout, placeholder = self.pending_tiles.pop(0)
+        size = placeholder.size()
+        if not placeholder.isVisible() or size.width() <= 1:
+            columns, rows = placeholder.grid_share
+            size = QApplication.primaryScreen().size()
+            size = QSize(size.width() // columns, size.height() // rows)
+        scale = placeholder.devicePixelRatioF()
+        url = camera.grid_url(int(size.width() * scale), int(size.height() * scale))
+        if url != camera.url:
+            print(f"{camera.name} tile ({size.width()}x{size.height()}) uses {url}")
+
+        renderer = camera.options.get("renderer", "web")
+        if renderer in ("snapshot", "mjpeg"):
+            browser = SnapshotTile(renderer == "mjpeg", camera.refresh_ms)
+        else:
+            browser = self.camera_profile.createView(camera.name)
+        browser.setCursor(Qt.BlankCursor)
+        browser.max_retries = 1000
+        browser.url_to_load = QUrl(url)
+        browser.camera_url = camera.url
+        browser.home_layout = layout  # Where it goes back to after being shown fullscreen
+        browser.tile_button = placeholder.tile_button  # Highlighted while the camera shows motion
+        self.camera_views[camera.url] = browser
+        self.grid_lifecycle.addView(browser)
+        self.tile_sampler.addView(browser)
+        self.camera_health.addView(browser, camera.name)
+        browser.load(browser.url_to_load)
+        browser.loadFinished.connect(lambda success, b=browser: self.handle_load_finished(b, success))
+        browser.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        layout.replaceWidget(placeholder, browser)
+        placeholder.deleteLater()
+
+        if self.pending_tiles:
+            self.tile_timer.start(GRID_TILE_STAGGER_MS)
+
     def closeApp(self):
         QApplication.quit()
         
     def handle_load_finished(self, browser, success):
+        self.camera_health.onLoadFinished(browser, success)  # Reconnects failed loads with backoff
         if success:
-            browser.retry_count = 0  # Reset on success
+            if not self.first_camera:
+                self.first_camera = True
+                STARTUP.mark(f"first camera ({browser.url_to_load.host()})")
+                STARTUP.report()
             # js = """
             #         // Replace these with the actual element IDs or selectors
             #         document.querySelector('input[name="username"]').value = '%s';
@@ -908,18 +3867,11 @@ class WebGrid(QWidget):
             #     """ % ("my_username", "my_password")
 
             # browser.page().runJavaScript(js)            
-        else:
-            if browser.retry_count < browser.max_retries:
-                browser.retry_count += 1
-                print(f"Retrying {browser.url_to_load.toString()} (attempt {browser.retry_count})")
-                QTimer.singleShot(10000, lambda: browser.load(browser.url_to_load))  # Retry after 1s
-            else:
-                print(f"Failed to load {browser.url_to_load.toString()} after {browser.retry_count} attempts")
-                # Optional: show error page or placeholder
 
     def show_fullscreen(self, url, video_mode=False):
         # Clear fullscreen layout
         self.mode = Mode.CAMERA_FULLSCREEN
+        self.returnFullscreenView()
         while self.fullscreen_layout.count():
             child = self.fullscreen_layout.takeAt(0)
             if child.widget():
@@ -933,13 +3885,25 @@ class WebGrid(QWidget):
 
         self.fullscreen_layout.addWidget(back_button)
 
-        if not video_mode:
-            browser = QWebEngineView()
+        camera = self.camera_by_url.get(url)
+        tile = self.camera_views.get(url)
+        if camera is not None:
+            url = camera.fullscreen_url
+        if not video_mode and tile is not None and tile.url_to_load == QUrl(url):
+            # Move the grid tile's live view across rather than opening the stream a second time
+            browser = tile
+            self.grid_lifecycle.activate(browser)
+            browser.home_layout.removeWidget(browser)
+            self.fullscreen_layout.addWidget(browser)
+            self.fullscreen_view = browser
+            self.stack.setCurrentWidget(self.fullscreen_widget)
+        elif not video_mode:
+            browser = self.camera_profile.createView(f"fullscreen {QUrl(url).host()}")
             browser.load(QUrl(url))
             self.fullscreen_layout.addWidget(browser)
             self.stack.setCurrentWidget(self.fullscreen_widget)
         else:
-            self.player.setMedia(QMediaContent(QUrl(url)))
+            self.photoPlayer().setMedia(QMediaContent(QUrl(url)))
             self.playerview = VideoPlayerWidget(self.player)
             self.fullscreen_layout.addWidget(self.playerview)
 
@@ -965,8 +3929,48 @@ class WebGrid(QWidget):
             # Retry logic
             QTimer.singleShot(2000, lambda: self.player.play())
         
+    def onStackChanged(self, index):
+        # Camera streams only run while they can be seen
+        if self.stack.widget(index) is self.grid_widget:
+            self.grid_lifecycle.resume()
+            if self.pending_tiles:
+                self.tile_timer.start(GRID_TILE_STAGGER_MS)
+        else:
+            self.grid_lifecycle.suspend(keep=self.fullscreen_view)
+
+    def returnFullscreenView(self):
+        """Put a grid tile's view borrowed by show_fullscreen back at the top of its tile."""
+        browser = self.fullscreen_view
+        if browser is None:
+            return
+        self.fullscreen_view = None
+        self.fullscreen_layout.removeWidget(browser)
+        browser.home_layout.insertWidget(0, browser)
+
+    def onMotion(self, view, active):
+        if isinstance(view, SnapshotTile):
+            view.setBoost(active)
+        button = view.tile_button
+        button.setProperty("motion", active)
+        button.style().unpolish(button)
+        button.style().polish(button)
+        if not MOTION_AUTO_FULLSCREEN:
+            return
+        if active and self.mode == Mode.CAMERA:
+            self.show_fullscreen(view.camera_url)
+            # Only a tile moved onto the fullscreen page keeps being sampled; one replaced by a
+            # separate fullscreen stream is frozen, so its going quiet says nothing about the scene
+            if self.fullscreen_view is view:
+                self.motion_promoted = view
+        elif not active and view is self.motion_promoted and self.mode == Mode.CAMERA_FULLSCREEN:
+            self.showCameras()
+
     def showCameras(self):
         self.mode = Mode.CAMERA
+        self.motion_promoted = None
+        # Hand a borrowed tile view back, and close a view opened for the fullscreen stream so it
+        # doesn't carry on decoding behind the grid
+        self.clear_fullscreen()
         self.stack.setCurrentWidget(self.grid_widget)
         self.viewer_btn.setFocus()
 
@@ -974,6 +3978,7 @@ class WebGrid(QWidget):
     def launch_security_video_viewer(self):
         self.timer.stop()
         self.clear_fullscreen()
+        self.securityVideoWindow()
         self.mode = Mode.SECURITY_CAMERA_FOLDER
         self.stack.setCurrentWidget(self.security_video_widget)        
         
@@ -1287,7 +4292,7 @@ class WebGrid(QWidget):
         self.slideshow_label.setAlignment(Qt.AlignCenter)
         self.slideshow_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         layout.addWidget(self.slideshow_label)
-        self.playerview = VideoPlayerWidget(self.player)
+        self.playerview = VideoPlayerWidget(self.photoPlayer())
         layout.addWidget(self.playerview)
 
         self.fullscreen_layout.addWidget(container)
@@ -1300,6 +4305,7 @@ class WebGrid(QWidget):
 
     def clear_fullscreen(self):
         self.timer.stop()
+        self.returnFullscreenView()
         while self.fullscreen_layout.count():
             child = self.fullscreen_layout.takeAt(0)
             if child.widget():
@@ -1393,7 +4399,9 @@ class WebGrid(QWidget):
         self.init_layout()
         
 if __name__ == "__main__":
+    configure_chromium()
     app = QApplication(sys.argv)
+    STARTUP.mark("app")
 
     app.setStyleSheet("""
         QPushButton:focus, QLabel:focus {
@@ -0,0 +1,49 @@
+"""ffmpeg work for cctv.py's ContactSheets, run in its worker processes.
+
+Kept apart from cctv.py and free of Qt so that the pool's forkserver, which preloads
+only this module, never has Qt or any threads in it when it forks a worker.
+"""
+import os
+import json
+import shutil
+import subprocess
+
+
+def idle_priority():
+    """Pool initializer: run the worker (and the ffmpeg it starts) only when nothing else wants the CPU."""
+    os.nice(19)
+    if hasattr(os, "sched_setscheduler") and hasattr(os, "SCHED_IDLE"):
+        try:
+            os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+        except OSError:
+            pass
+
+
+def build_contact_sheet(clip_path, sheet_path, grid, tile):
+    """Compose evenly spaced keyframes of a clip into one JPEG grid; runs in a ContactSheets worker process.
+
+    Only keyframes are decoded (-skip_frame nokey) and the fps filter picks the one
+    nearest each slot. The frame times go in a .json file beside the sheet.
+    """
+    ffmpeg, ffprobe = shutil.which("ffmpeg"), shutil.which("ffprobe")
+    if ffmpeg is None or ffprobe is None:
+        raise RuntimeError("ffmpeg/ffprobe not installed")
+    probe = subprocess.run([ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", clip_path],
+                           capture_output=True, text=True, check=True, timeout=30)
+    duration = float(probe.stdout.strip())
+    columns, rows = grid
+    width, height = tile
+    frames = columns * rows
+    vf = (f"fps={frames}/{duration:.3f},"
+          f"scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,"
+          f"tile={columns}x{rows}")
+    tmp_path = sheet_path + ".tmp.jpg"
+    subprocess.run([ffmpeg, "-nostdin", "-loglevel", "error", "-skip_frame", "nokey", "-i", clip_path,
+                    "-an", "-vf", vf, "-frames:v", "1", "-y", tmp_path], check=True, timeout=120)
+    meta = {"duration_ms": int(duration * 1000), "grid": [columns, rows], "tile": [width, height],
+            "times_ms": [int(i * duration * 1000 / frames) for i in range(frames)]}
+    with open(sheet_path + ".json.tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, sheet_path)
+    os.replace(sheet_path + ".json.tmp", sheet_path + ".json")
+    return sheet_path
@@ -0,0 +1,90 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from PyQt5.QtWidgets import QApplication, QWidget, QHBoxLayout
+from PyQt5.QtGui import QImage, QPainter, QColor, QFont
+from PyQt5.QtCore import Qt, QBuffer, QByteArray, QIODevice
+
+from cctv import SnapshotTile
+
+# Stand-in camera: /snapshot.jpg returns the current frame, /mjpeg streams them at 10 fps
+FRAMES = []
+
+
+def make_frames(count=30, width=1280, height=720):
+    for n in range(count):
+        image = QImage(width, height, QImage.Format_RGB32)
+        image.fill(QColor.fromHsv(n * 360 // count, 200, 160))
+        painter = QPainter(image)
+        painter.setPen(Qt.white)
+        painter.setFont(QFont("Sans", 120))
+        painter.drawText(image.rect(), Qt.AlignCenter, str(n))
+        painter.end()
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        image.save(buffer, "JPEG", 80)
+        FRAMES.append(bytes(data))
+
+
+def current_frame():
+    return FRAMES[int(time.time() * 10) % len(FRAMES)]
+
+
+class CameraHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/snapshot.jpg":
+            frame = current_frame()
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(frame)))
+            self.end_headers()
+            self.wfile.write(frame)
+        elif self.path == "/mjpeg":
+            self.send_response(200)
+            self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+            self.end_headers()
+            try:
+                while True:
+                    frame = current_frame()
+                    self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\n")
+                    self.wfile.write(f"Content-Length: {len(frame)}\r\n\r\n".encode())
+                    self.wfile.write(frame + b"\r\n")
+                    time.sleep(0.1)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass  # Polling every second makes the default logging noisy
+
+
+class SnapshotWindow(QWidget):
+    def __init__(self, port):
+        super().__init__()
+        self.setWindowTitle("Snapshot Tiles")
+        self.resize(1000, 300)
+        layout = QHBoxLayout(self)
+
+        self.snapshot = SnapshotTile()
+        self.mjpeg = SnapshotTile(mjpeg=True, interval=500)
+        for tile in (self.snapshot, self.mjpeg):
+            tile.loadFinished.connect(lambda ok, t=tile: print(t.url_to_load.toString(), "loaded" if ok else "failed"))
+            layout.addWidget(tile)
+
+        self.snapshot.load(f"http://127.0.0.1:{port}/snapshot.jpg")
+        self.mjpeg.load(f"http://127.0.0.1:{port}/mjpeg")
+
+if __name__ == "__main__":
+    import sys
+    app = QApplication(sys.argv)
+    make_frames()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CameraHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print("Stand-in camera on port", server.server_port)
+    w = SnapshotWindow(server.server_port)
+    w.show()
+    sys.exit(app.exec_())